@@ -13,29 +13,34 @@ import logging
 import threading
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, UTC
 
 from flask import Flask, request, jsonify, redirect
 from flasgger import Swagger
-from dotenv import load_dotenv
 
 # Add project root to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# --- CONFIGURATION ---
+# The only .env load: project modules read their settings at import time.
+# Deployments inject env vars directly, so dotenv is only touched when a local .env exists.
+_ENV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+if os.path.exists(_ENV_FILE):
+    from dotenv import load_dotenv
+    load_dotenv(_ENV_FILE)
+
 from core.persona import generate_persona, get_system_prompt, get_extraction_prompt
 from core.llm_client import generate_agent_response, get_random_fallback
 from models.intelligence import extract_all_intelligence, merge_intelligence, has_actionable_intel
 from utils.insforge_client import (
     get_persona, save_persona, update_session_activity,
-    save_intelligence, save_message, mark_callback_sent,
+    save_intelligence, queue_message, mark_callback_sent,
     get_cached_persona, cache_persona, get_callback_sent
 )
 from utils.guvi_callback import send_callback_async, build_callback_payload
 from utils import whatsapp_handler as wa_handler
 
-# --- CONFIGURATION ---
-load_dotenv()
-
 # Check if WhatsApp is configured
 whatsapp_configured = wa_handler.is_whatsapp_configured()
 
@@ -272,9 +277,44 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Shared workers for fire-and-forget DB writes and read receipts; bounded under bursts
+_BACKGROUND_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="bg-io")
+
+
 def run_async(func, *args, **kwargs):
-    thread = threading.Thread(target=func, args=args, kwargs=kwargs, daemon=True)
-    thread.start()
+    _BACKGROUND_POOL.submit(func, *args, **kwargs)
+
+
+# Read receipts are cosmetic: cap how many may be pending so a burst can't
+# flood the background pool; extras are dropped rather than queued.
+_READ_RECEIPT_SLOTS = threading.BoundedSemaphore(50)
+
+
+def send_read_receipt(message_id: str) -> None:
+    try:
+        wa_handler.mark_message_read(message_id)
+    finally:
+        _READ_RECEIPT_SLOTS.release()
+
+
+def queue_read_receipt(message_id: str) -> None:
+    """Send a read receipt in the background if a slot is free; otherwise skip it."""
+    if not _READ_RECEIPT_SLOTS.acquire(blocking=False):
+        return
+    try:
+        run_async(send_read_receipt, message_id)
+    except BaseException:
+        # Never scheduled (e.g. pool already shut down at worker exit): hand the slot back
+        _READ_RECEIPT_SLOTS.release()
+        raise
+
+
+def persist_intelligence(session_id: str, intel: dict, scam_detected: bool, agent_notes: str) -> None:
+    """Upsert intelligence, then flag the callback as sent.
+    Kept in order on one worker: the upsert writes callback_sent=False.
+    """
+    save_intelligence(session_id, intel, scam_detected, agent_notes)
+    mark_callback_sent(session_id)
 
 def start_keep_warm():
     url = os.getenv("KEEP_WARM_URL")
@@ -330,10 +370,9 @@ def get_or_create_persona(session_id: str) -> dict:
     Ensures persona consistency across messages.
     """
     # Try to get from database first
-    existing = get_persona(session_id)
+    existing = get_persona(session_id)  # Also refreshes the in-process cache
     if existing:
         logger.info(f"♻️ Loaded existing persona for session: {session_id}")
-        cache_persona(session_id, existing)  # Update cache
         return existing
     
     # Try cache (fallback when DB unavailable)
@@ -515,8 +554,8 @@ def honey_pot_chat():
         if intel_summary:
             agent_notes = f"{agent_notes} | Extracted: {', '.join(intel_summary)}".strip()
         
-        run_async(save_message, session_id, "scammer", incoming_msg)
-        run_async(save_message, session_id, "agent", llm_response.get("response", ""), strategy)
+        queue_message(session_id, "scammer", incoming_msg)
+        queue_message(session_id, "agent", llm_response.get("response", ""), strategy)
         run_async(update_session_activity, session_id, total_messages)
         
         # Also send callback when scam is detected with significant keywords even without bank/UPI
@@ -538,8 +577,7 @@ def honey_pot_chat():
                 agent_notes=f"{strategy} | {agent_notes}"
             )
             send_callback_async(callback_payload)
-            run_async(save_intelligence, session_id, combined_intel, scam_detected, agent_notes)
-            run_async(mark_callback_sent, session_id)
+            run_async(persist_intelligence, session_id, combined_intel, scam_detected, agent_notes)
             with _callbacks_lock:
                 SENT_CALLBACKS[session_id] = current_intel_count
             logger.info(f"🎯 Intelligence extracted! UPIs: {combined_intel.get('upi_ids')}, Banks: {combined_intel.get('bank_accounts')}")
@@ -738,7 +776,7 @@ def whatsapp_webhook():
     if not whatsapp_configured:
         return jsonify({"status": "not_configured"}), 404
     try:
-        data = request.get_json()
+        data = wa_handler.parse_webhook_body(request.get_data())
         parsed = wa_handler.parse_webhook_message(data)
         
         if not parsed:
@@ -758,9 +796,9 @@ def whatsapp_webhook():
             wa_handler.send_text_message(phone_number, "Pong! Iron-Mask is online 🟢")
             return jsonify({"status": "pong"}), 200
         
-        # Mark as read
+        # Mark as read (off the request path; the receipt doesn't gate the reply)
         if message_id:
-            wa_handler.mark_message_read(message_id)
+            queue_read_receipt(message_id)
         
         # Get conversation history
         conversation_history = wa_handler.get_conversation_history(phone_number)
@@ -818,8 +856,8 @@ def whatsapp_webhook():
         wa_handler.add_to_conversation_history(phone_number, "agent", reply)
         
         # Save to DB
-        run_async(save_message, session_id, "scammer", text)
-        run_async(save_message, session_id, "agent", reply, strategy)
+        queue_message(session_id, "scammer", text)
+        queue_message(session_id, "agent", reply, strategy)
         run_async(update_session_activity, session_id, total_messages)
         
         # GUVI callback
@@ -837,8 +875,7 @@ def whatsapp_webhook():
                 agent_notes=f"WhatsApp | {strategy} | {agent_notes}"
             )
             send_callback_async(callback_payload)
-            run_async(save_intelligence, session_id, combined_intel, scam_detected, agent_notes)
-            run_async(mark_callback_sent, session_id)
+            run_async(persist_intelligence, session_id, combined_intel, scam_detected, agent_notes)
             with _callbacks_lock:
                 SENT_CALLBACKS[session_id] = current_intel_count
             logger.info(f"🎯 WhatsApp Intel: UPIs={combined_intel.get('upi_ids')}")
@@ -12,6 +12,7 @@ Key Features:
 import re
 import random
 import hashlib
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Tuple, Set
 from enum import Enum
 
@@ -100,6 +101,15 @@ INTENT_PATTERNS = {
     ]
 }
 
+# Each intent's patterns compiled once into a single alternation, so
+# detect_intents does one scan per intent instead of one per pattern.
+# (Kept per-intent: one global alternation would let a match for one
+# intent consume text that another intent also needs.)
+_INTENT_REGEXES = {
+    intent: re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+    for intent, patterns in INTENT_PATTERNS.items()
+}
+
 
 # ============= COMPONENT-BASED RESPONSES =============
 
@@ -285,46 +295,66 @@ REVERSE_EXTRACT_BY_CATEGORY = {
 # Track per session what we've used AND what scammer has revealed
 _session_data: Dict[str, Dict] = {}
 
+def _new_session() -> Dict:
+    """Fresh per-session tracking state."""
+    return {
+        # Response tracking
+        "used_stalls": [],           # Exact stall responses used
+        "used_tangents": [],         # Tangent phrases used
+        "used_extractions": [],      # Extraction phrases used
+        "asked_categories": [],      # Categories of info we've asked for
+        "last_response_type": None,  # To avoid same type twice
+        "response_count": 0,         # Total responses in session
+        "phrase_hashes": set(),      # Hash of first few words to detect similar starts
+        "stall_pools": {},           # Intent -> pre-shuffled stall order (see prewarm_session)
+        
+        # CONVERSATION MEMORY - what scammer has revealed
+        "scammer_memory": {
+            "claimed_name": None,        # "My name is Rajesh"
+            "claimed_employee_id": None, # "My ID is SBI12345"
+            "claimed_bank": None,        # "I am from SBI"
+            "claimed_upi": None,         # "My UPI is xyz@bank"
+            "claimed_phone": None,       # "Call me at 98765..."
+            "claimed_account": None,     # "My account is 1234..."
+            "claimed_designation": None, # "I am manager"
+            "claimed_branch": None,
+            "claimed_email": None,
+            "claimed_ifsc": None,
+            "threat_type": None,         # "digital arrest", "account blocked"
+            "urgency_level": 0,          # How urgent they're being (0-3)
+            "times_asked_otp": 0,        # How many times they asked for OTP
+            "times_asked_account": 0,    # How many times they asked for account
+            "links_shared": [],          # Any URLs they shared
+            "apps_mentioned": [],        # Apps they want us to install
+        },
+        
+        # Strategic context
+        "scam_type_detected": None,  # bank_fraud, digital_arrest, etc.
+        "previous_scam_type": None,  # For style-switch detection
+        "style_switch_count": 0,     # How many times scammer changed tactics
+        "scammer_getting_frustrated": False,  # Are they pushing harder?
+    }
+
+
 def get_session_data(session_id: str) -> Dict:
     """Get or create session tracking data with conversation memory."""
-    if session_id not in _session_data:
-        _session_data[session_id] = {
-            # Response tracking
-            "used_stalls": [],           # Exact stall responses used
-            "used_tangents": [],         # Tangent phrases used
-            "used_extractions": [],      # Extraction phrases used
-            "asked_categories": [],      # Categories of info we've asked for
-            "last_response_type": None,  # To avoid same type twice
-            "response_count": 0,         # Total responses in session
-            "phrase_hashes": set(),      # Hash of first few words to detect similar starts
-            
-            # CONVERSATION MEMORY - what scammer has revealed
-            "scammer_memory": {
-                "claimed_name": None,        # "My name is Rajesh"
-                "claimed_employee_id": None, # "My ID is SBI12345"
-                "claimed_bank": None,        # "I am from SBI"
-                "claimed_upi": None,         # "My UPI is xyz@bank"
-                "claimed_phone": None,       # "Call me at 98765..."
-                "claimed_account": None,     # "My account is 1234..."
-                "claimed_designation": None, # "I am manager"
-                "claimed_branch": None,
-                "claimed_email": None,
-                "claimed_ifsc": None,
-                "threat_type": None,         # "digital arrest", "account blocked"
-                "urgency_level": 0,          # How urgent they're being (0-3)
-                "times_asked_otp": 0,        # How many times they asked for OTP
-                "times_asked_account": 0,    # How many times they asked for account
-                "links_shared": [],          # Any URLs they shared
-                "apps_mentioned": [],        # Apps they want us to install
-            },
-            
-            # Strategic context
-            "scam_type_detected": None,  # bank_fraud, digital_arrest, etc.
-            "previous_scam_type": None,  # For style-switch detection
-            "style_switch_count": 0,     # How many times scammer changed tactics
-            "scammer_getting_frustrated": False,  # Are they pushing harder?
-        }
-    return _session_data[session_id]
+    # Single dict lookup on the hot path; the template is only built on a miss
+    session = _session_data.get(session_id)
+    if session is None:
+        session = _session_data[session_id] = _new_session()
+    return session
+
+
+def prewarm_session(session_id: str, intent: ScammerIntent, k: Optional[int] = None) -> None:
+    """
+    Pre-shuffle the stall pool for an intent once per session.
+    build_response then pops from this order instead of rescanning the
+    whole pool for unused stalls on every turn.
+    """
+    session = get_session_data(session_id)
+    pool = STALL_RESPONSES.get(intent, STALL_RESPONSES[ScammerIntent.UNKNOWN])
+    k = len(pool) if k is None else min(k, len(pool))
+    session["stall_pools"][intent] = random.sample(pool, k)
 
 
 def extract_scammer_intel(message: str, session: Dict) -> None:
@@ -333,6 +363,51 @@ def extract_scammer_intel(message: str, session: Dict) -> None:
     Updates the session's scammer_memory in place.
     """
     memory = session["scammer_memory"]
+    # Regex work depends only on the text (history is re-scanned every turn);
+    # applying it to this session's memory stays per call
+    memory_updates, new_scam_type, urgent, asks_otp, asks_account, links, app = _extract_features(message)
+    memory.update(memory_updates)
+    
+    # Style-switch detection: if scammer changes tactics mid-conversation
+    if new_scam_type:
+        old_scam_type = session.get("scam_type_detected")
+        if old_scam_type and old_scam_type != new_scam_type:
+            session["previous_scam_type"] = old_scam_type
+            session["style_switch_count"] = session.get("style_switch_count", 0) + 1
+        session["scam_type_detected"] = new_scam_type
+    
+    # Track urgency escalation
+    if urgent:
+        memory["urgency_level"] = min(memory["urgency_level"] + 1, 3)
+    
+    # Track OTP requests
+    if asks_otp:
+        memory["times_asked_otp"] += 1
+    
+    # Track account requests  
+    if asks_account:
+        memory["times_asked_account"] += 1
+    
+    # Check if scammer is getting frustrated
+    if memory["times_asked_otp"] >= 3 or memory["urgency_level"] >= 2:
+        session["scammer_getting_frustrated"] = True
+    
+    # Extract any links
+    if links:
+        memory["links_shared"].extend(links)
+    
+    # Extract mentioned apps
+    if app:
+        memory["apps_mentioned"].append(app)
+
+
+@lru_cache(maxsize=2048)
+def _extract_features(message: str):
+    """Session-independent scan of one scammer message, frozen for lru_cache.
+
+    Returns (memory_updates, scam_type, urgent, asks_otp, asks_account, links, app).
+    """
+    updates = {}
     message_lower = message.lower()
     
     # Extract claimed name
@@ -350,7 +425,7 @@ def extract_scammer_intel(message: str, session: Dict) -> None:
         match = re.search(pattern, message, re.IGNORECASE)
         if match:
             raw_name = re.sub(r'\s+', ' ', match.group(1)).strip()
-            memory["claimed_name"] = raw_name.title()
+            updates["claimed_name"] = raw_name.title()
             break
     
     # Extract employee ID
@@ -363,7 +438,7 @@ def extract_scammer_intel(message: str, session: Dict) -> None:
     for pattern in id_patterns:
         match = re.search(pattern, message, re.IGNORECASE)
         if match:
-            memory["claimed_employee_id"] = match.group(1)
+            updates["claimed_employee_id"] = match.group(1)
             break
     
     # Extract bank name
@@ -374,7 +449,7 @@ def extract_scammer_intel(message: str, session: Dict) -> None:
     for pattern in bank_patterns:
         match = re.search(pattern, message_lower)
         if match:
-            memory["claimed_bank"] = match.group(1).upper()
+            updates["claimed_bank"] = match.group(1).upper()
             break
     
     # Extract UPI ID and Email — disambiguate by checking for email TLD domains
@@ -387,43 +462,43 @@ def extract_scammer_intel(message: str, session: Dict) -> None:
         
         if is_email or re.search(r'\bemail\b', message_lower):
             # It's an email address
-            memory["claimed_email"] = match_val
+            updates["claimed_email"] = match_val
         else:
             # It's a UPI ID (no email-like TLD)
-            memory["claimed_upi"] = match_val
+            updates["claimed_upi"] = match_val
     
     # Extract phone number
     phone_match = re.search(r'\+?91[\s-]?(\d{10})', message)
     if phone_match:
-        memory["claimed_phone"] = phone_match.group(0)
+        updates["claimed_phone"] = phone_match.group(0)
     elif re.search(r'(\d{10})', message):
         phone_match = re.search(r'(\d{10})', message)
-        memory["claimed_phone"] = phone_match.group(1)
+        updates["claimed_phone"] = phone_match.group(1)
     
     # Extract account number (long number)
     account_match = re.search(r'(\d{12,16})', message)
     if account_match:
-        memory["claimed_account"] = account_match.group(1)
+        updates["claimed_account"] = account_match.group(1)
 
     ifsc_match = re.search(r'\b[A-Z]{4}0[A-Z0-9]{6}\b', message.upper())
     if ifsc_match:
-        memory["claimed_ifsc"] = ifsc_match.group(0)
+        updates["claimed_ifsc"] = ifsc_match.group(0)
 
     branch_match = re.search(r'\b([a-zA-Z ]+)\s+branch\b', message, re.IGNORECASE)
     if branch_match:
-        memory["claimed_branch"] = branch_match.group(1).strip().title()
+        updates["claimed_branch"] = branch_match.group(1).strip().title()
 
     designation_match = re.search(r'\b(manager|officer|agent|executive|fraud prevention|customer care|support)\b', message_lower)
     if designation_match:
-        memory["claimed_designation"] = designation_match.group(1).title()
+        updates["claimed_designation"] = designation_match.group(1).title()
     
     # Detect threat type with style-switch detection
     new_scam_type = None
     if re.search(r'digital arrest|cyber crime|cbi|police|warrant', message_lower):
-        memory["threat_type"] = "digital_arrest"
+        updates["threat_type"] = "digital_arrest"
         new_scam_type = "digital_arrest"
     elif re.search(r'blocked|suspended|frozen|compromised', message_lower):
-        memory["threat_type"] = "account_blocked"
+        updates["threat_type"] = "account_blocked"
         new_scam_type = "bank_fraud"
     elif re.search(r'lottery|won|prize|reward', message_lower):
         new_scam_type = "lottery_scam"
@@ -442,39 +517,14 @@ def extract_scammer_intel(message: str, session: Dict) -> None:
     elif re.search(r'kyc|update.*account|verify.*identity', message_lower):
         new_scam_type = "kyc_fraud"
     
-    # Style-switch detection: if scammer changes tactics mid-conversation
-    if new_scam_type:
-        old_scam_type = session.get("scam_type_detected")
-        if old_scam_type and old_scam_type != new_scam_type:
-            session["previous_scam_type"] = old_scam_type
-            session["style_switch_count"] = session.get("style_switch_count", 0) + 1
-        session["scam_type_detected"] = new_scam_type
-    
-    # Track urgency escalation
-    if re.search(r'immediately|urgent|now|quickly|hurry', message_lower):
-        memory["urgency_level"] = min(memory["urgency_level"] + 1, 3)
-    
-    # Track OTP requests
-    if re.search(r'\botp\b', message_lower):
-        memory["times_asked_otp"] += 1
-    
-    # Track account requests  
-    if re.search(r'account\s*(number|detail|no)', message_lower):
-        memory["times_asked_account"] += 1
-    
-    # Check if scammer is getting frustrated
-    if memory["times_asked_otp"] >= 3 or memory["urgency_level"] >= 2:
-        session["scammer_getting_frustrated"] = True
-    
-    # Extract any links
-    links = re.findall(r'https?://\S+', message)
-    if links:
-        memory["links_shared"].extend(links)
-    
-    # Extract mentioned apps
+    urgent = bool(re.search(r'immediately|urgent|now|quickly|hurry', message_lower))
+    asks_otp = bool(re.search(r'\botp\b', message_lower))
+    asks_account = bool(re.search(r'account\s*(number|detail|no)', message_lower))
+    links = tuple(re.findall(r'https?://\S+', message))
     app_match = re.search(r'(anydesk|teamviewer|quickshare|zoom|remote)', message_lower)
-    if app_match:
-        memory["apps_mentioned"].append(app_match.group(1))
+    app = app_match.group(1) if app_match else None
+    
+    return tuple(updates.items()), new_scam_type, urgent, asks_otp, asks_account, links, app
 
 def get_phrase_hash(text: str) -> str:
     """Get hash of first 8 words to detect similar phrases (increased from 5)."""
@@ -514,13 +564,10 @@ def mark_response_used(session: Dict, response: str, response_type: ResponseType
 def detect_intents(message: str) -> List[ScammerIntent]:
     """Detect all intents present in the scammer's message."""
     message_lower = message.lower()
-    detected = []
-    
-    for intent, patterns in INTENT_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, message_lower, re.IGNORECASE):
-                detected.append(intent)
-                break
+    detected = [
+        intent for intent, regex in _INTENT_REGEXES.items()
+        if regex.search(message_lower)
+    ]
     
     if not detected:
         detected.append(ScammerIntent.UNKNOWN)
@@ -685,12 +732,21 @@ def build_response(
     # Get stall pool for this intent
     stall_pool = STALL_RESPONSES.get(primary_intent, STALL_RESPONSES[ScammerIntent.UNKNOWN])
     
-    # Filter out used stalls
-    available_stalls = [s for s in stall_pool if not is_similar_used(session, s)]
-    if not available_stalls:
-        available_stalls = stall_pool
+    # Pop from the pre-shuffled order when the session was prewarmed
+    base_stall = None
+    queue = session.get("stall_pools", {}).get(primary_intent)
+    while queue:
+        candidate = queue.pop()
+        if not is_similar_used(session, candidate):
+            base_stall = candidate
+            break
     
-    base_stall = random.choice(available_stalls)
+    if base_stall is None:
+        # Filter out used stalls
+        available_stalls = [s for s in stall_pool if not is_similar_used(session, s)]
+        if not available_stalls:
+            available_stalls = stall_pool
+        base_stall = random.choice(available_stalls)
     
     if response_type == ResponseType.PURE_STALL:
         return base_stall
@@ -802,22 +858,8 @@ def get_reverse_extraction_prompt(
     return random.choice(available)
 
 
-def analyze_conversation(
-    current_message: str,
-    conversation_history: List[Dict[str, str]],
-    used_responses: List[str],
-    session_id: str = "default"
-) -> Dict[str, Any]:
-    """
-    Complete conversation analysis for smart response generation.
-    Analyzes the ENTIRE conversation history to strategically respond.
-    
-    Returns:
-        Analysis dict with intents, phase, suggested response, scammer memory, etc.
-    """
-    session = get_session_data(session_id)
-    
-    # STEP 1: Reset mutable counters before full re-scan to prevent inflation.
+def _reset_scan_counters(session: Dict) -> None:
+    """Reset mutable memory counters before (re-)scanning scammer messages."""
     # Without this, re-processing history on every call would keep incrementing
     # times_asked_otp / times_asked_account and duplicating links_shared / apps_mentioned.
     memory = session["scammer_memory"]
@@ -827,15 +869,17 @@ def analyze_conversation(
     memory["links_shared"] = []
     memory["apps_mentioned"] = []
     session["scammer_getting_frustrated"] = False
-    
-    # Now re-scan ALL scammer messages (build full memory from scratch)
-    for msg in conversation_history:
-        if msg.get("sender") == "scammer":
-            extract_scammer_intel(msg.get("text", ""), session)
-    
-    # Extract from current message too
-    extract_scammer_intel(current_message, session)
-    
+
+
+def _build_analysis(
+    session: Dict,
+    session_id: str,
+    current_message: str,
+    conversation_history: List[Dict[str, str]],
+    used_responses: List[str]
+) -> Dict[str, Any]:
+    """Detect intents/phase, pick a response and build the analysis dict.
+    Assumes scammer memory is already up to date for current_message."""
     # STEP 2: Detect intents and phase
     intents = detect_intents(current_message)
     phase = detect_conversation_phase(conversation_history, intents)
@@ -881,6 +925,65 @@ def analyze_conversation(
     return analysis
 
 
+def analyze_conversation(
+    current_message: str,
+    conversation_history: List[Dict[str, str]],
+    used_responses: List[str],
+    session_id: str = "default"
+) -> Dict[str, Any]:
+    """
+    Complete conversation analysis for smart response generation.
+    Analyzes the ENTIRE conversation history to strategically respond.
+    
+    Returns:
+        Analysis dict with intents, phase, suggested response, scammer memory, etc.
+    """
+    session = get_session_data(session_id)
+    
+    # STEP 1: Reset mutable counters before full re-scan to prevent inflation.
+    _reset_scan_counters(session)
+    
+    # Now re-scan ALL scammer messages (build full memory from scratch)
+    for msg in conversation_history:
+        if msg.get("sender") == "scammer":
+            extract_scammer_intel(msg.get("text", ""), session)
+    
+    # Extract from current message too
+    extract_scammer_intel(current_message, session)
+    
+    return _build_analysis(session, session_id, current_message, conversation_history, used_responses)
+
+
+def analyze_conversation_batch(
+    scammer_messages: List[str],
+    session_id: str = "default",
+    used_responses: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Analyze a whole scripted conversation in one call.
+    Equivalent to calling analyze_conversation once per message with the
+    growing history, but scammer memory is built incrementally so each
+    message is scanned once instead of re-scanning the full history per turn.
+    
+    Returns:
+        One analysis dict per scammer message, in order.
+    """
+    session = get_session_data(session_id)
+    _reset_scan_counters(session)
+    used = used_responses if used_responses is not None else []
+    
+    history: List[Dict[str, str]] = []
+    analyses = []
+    for message in scammer_messages:
+        extract_scammer_intel(message, session)
+        analysis = _build_analysis(session, session_id, message, history, used)
+        analyses.append(analysis)
+        history.append({"sender": "scammer", "text": message})
+        history.append({"sender": "agent", "text": analysis["suggested_fallback"]})
+    
+    return analyses
+
+
 def personalize_response(response: str, session: Dict) -> str:
     """
     Personalize a response using what we know about the scammer.
@@ -6,15 +6,20 @@ Handles API calls to multiple LLM models with parallel execution and smart respo
 import os
 import json
 import re
+import hashlib
 import logging
 import requests
+import threading
 import time
+from collections import OrderedDict
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from dotenv import load_dotenv
-
-load_dotenv()
+try:
+    import orjson  # Optional: faster parsing of model JSON replies
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +42,24 @@ if OPENROUTER_FALLBACK not in ALLOWED_MODELS:
     OPENROUTER_FALLBACK = "google/gemini-2.5-flash-lite"
 OPENROUTER_REPAIR_MODEL = os.getenv("OPENROUTER_REPAIR_MODEL", OPENROUTER_MODEL)
 
+# Keep-alive session shared by every OpenRouter call (parallel fan-out threads included),
+# so each model call reuses a pooled TLS connection instead of handshaking again
+_OPENROUTER_SESSION = requests.Session()
+_OPENROUTER_SESSION.mount(
+    "https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+)
+
+# Exact-match cache for deterministic (temperature 0) calls such as JSON repair.
+# Sampled calls are never cached: varied persona replies are the point there.
+_RESPONSE_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_RESPONSE_CACHE_MAX = 256
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def _response_cache_key(messages: List[Dict[str, str]], model: str, temperature: float, max_tokens: int) -> str:
+    raw = json.dumps([messages, model, temperature, max_tokens], sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
 
 def call_openrouter(
     messages: List[Dict[str, str]],
@@ -70,6 +93,15 @@ def call_openrouter(
     }
     
     max_tokens = max(max_tokens, 500)
+    cache_key = None
+    if temperature == 0:
+        cache_key = _response_cache_key(messages, model, temperature, max_tokens)
+        with _RESPONSE_CACHE_LOCK:
+            cached = _RESPONSE_CACHE.get(cache_key)
+            if cached is not None:
+                _RESPONSE_CACHE.move_to_end(cache_key)
+                return cached
+
     payload = {
         "model": model,
         "messages": messages,
@@ -78,7 +110,7 @@ def call_openrouter(
     }
     
     try:
-        response = requests.post(
+        response = _OPENROUTER_SESSION.post(
             OPENROUTER_BASE_URL,
             headers=headers,
             json=payload,
@@ -88,7 +120,13 @@ def call_openrouter(
         if response.status_code == 200:
             data = response.json()
             if 'choices' in data and data['choices']:
-                 return data['choices'][0]['message']['content']
+                 content = data['choices'][0]['message']['content']
+                 if cache_key is not None and content:
+                     with _RESPONSE_CACHE_LOCK:
+                         _RESPONSE_CACHE[cache_key] = content
+                         if len(_RESPONSE_CACHE) > _RESPONSE_CACHE_MAX:
+                             _RESPONSE_CACHE.popitem(last=False)
+                 return content
             else:
                  logger.error(f"OpenRouter empty choices: {data}")
                  return f"Error: Empty response from model"
@@ -120,7 +158,7 @@ from models.intelligence import extract_all_intelligence, merge_intelligence
 
 # Generic fallback messages (used only when context detection fails)
 # These are stalling messages that work in any context
-GENERIC_FALLBACK_MESSAGES = [
+GENERIC_FALLBACK_MESSAGES = (
     "Acha ji, network is very slow. Please wait, I am trying...",
     "Hello? Can you hear me? My phone is breaking up.",
     "One minute, someone is at the door. I will just check.",
@@ -136,11 +174,23 @@ GENERIC_FALLBACK_MESSAGES = [
     "My neighbour aunty is calling me. One minute.",
     "I hear beeping sound. Is that from your side?",
     "Wait wait, I dropped my spectacles somewhere.",
-]
+)
+
+# Session response tracking to prevent repetition - GLOBAL across all fallbacks.
+# Both maps are LRU-ordered and capped so long-running servers don't grow without bound.
+_MAX_TRACKED_SESSIONS = 10_000
+_session_responses: "OrderedDict[str, List[str]]" = OrderedDict()
+_session_generic_index: "OrderedDict[str, int]" = OrderedDict()  # Track index for sequential generic selection
 
-# Session response tracking to prevent repetition - GLOBAL across all fallbacks
-_session_responses: Dict[str, List[str]] = {}
-_session_generic_index: Dict[str, int] = {}  # Track index for sequential generic selection
+
+def _touch_session(tracker: OrderedDict, session_id: str, default) -> None:
+    """Mark a session as recently used, adding it (and evicting the oldest) if new."""
+    if session_id in tracker:
+        tracker.move_to_end(session_id)
+    else:
+        tracker[session_id] = default
+        if len(tracker) > _MAX_TRACKED_SESSIONS:
+            tracker.popitem(last=False)
 
 def get_used_responses(session_id: str) -> List[str]:
     """Get list of previously used responses for a session."""
@@ -148,8 +198,7 @@ def get_used_responses(session_id: str) -> List[str]:
 
 def track_response(session_id: str, response: str):
     """Track a response as used for this session."""
-    if session_id not in _session_responses:
-        _session_responses[session_id] = []
+    _touch_session(_session_responses, session_id, [])
     
     # Only add if not already tracked (avoid duplicates in tracking)
     if response not in _session_responses[session_id]:
@@ -164,16 +213,15 @@ def get_random_fallback(session_id: str = "default") -> str:
     Get a fallback message that hasn't been used in this session.
     Uses sequential selection to avoid repetition.
     """
-    used = get_used_responses(session_id)
+    used = frozenset(get_used_responses(session_id))
     
-    # Filter out already used messages
+    # Filter out already used messages (one pass, O(1) membership)
     available = [msg for msg in GENERIC_FALLBACK_MESSAGES if msg not in used]
     
     if not available:
         # All used, reset but pick least recently used
         # Get the index for this session
-        if session_id not in _session_generic_index:
-            _session_generic_index[session_id] = 0
+        _touch_session(_session_generic_index, session_id, 0)
         
         idx = _session_generic_index[session_id] % len(GENERIC_FALLBACK_MESSAGES)
         _session_generic_index[session_id] = idx + 1
@@ -229,6 +277,16 @@ def get_contextual_fallback(
         logger.warning(f"Context analysis failed: {e}, using generic fallback")
         return get_random_fallback(session_id)
 
+def _loads(text: str) -> Any:
+    """json.loads via orjson when installed; inputs orjson rejects (e.g. NaN) go to json."""
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(text)
+
+
 def calculate_response_quality(response: str, model: str) -> int:
     """
     Calculate quality score for a response.
@@ -249,7 +307,7 @@ def calculate_response_quality(response: str, model: str) -> int:
     # Check for valid JSON
     try:
         cleaned = clean_json_string(response) if "{" in response else response
-        parsed = json.loads(cleaned)
+        parsed = _loads(cleaned)
         score += 50
         
         # Check for response field
@@ -383,13 +441,31 @@ def call_with_fallback(
     return random.choice(GENERIC_FALLBACK_MESSAGES)
 
 
+# clean_json_string rewrite rules, compiled once
+_CODE_FENCE_RE = re.compile(r'```json\s*|\s*```')
+# A comma before a closing brace or bracket; the closer is kept via group 1
+_TRAILING_COMMA_RE = re.compile(r',\s*([}\]])')
+# Group 1 is a protected token (quoted string or backslash escape) that is copied through;
+# group 2 is a bare Python constant sitting outside any string
+_PY_CONSTANT_RE = re.compile(
+    r'("(?:\\[\s\S]|[^"\\])*"?|\\[\s\S]?)'
+    r'|(?<![^ ,:\[])(True|False|None)(?=[ ,\]}\n\r]|\Z)'
+)
+_PY_TO_JSON = {"True": "true", "False": "false", "None": "null"}
+
+
+def _fix_python_constant(match: re.Match) -> str:
+    protected = match.group(1)
+    return protected if protected is not None else _PY_TO_JSON[match.group(2)]
+
+
 def clean_json_string(json_str: str) -> str:
     """Clean LLM output to extract a valid JSON string."""
     if not json_str:
         return ""
     
     # 1. Remove markdown code blocks if present
-    json_str = re.sub(r'```json\s*|\s*```', '', json_str)
+    json_str = _CODE_FENCE_RE.sub('', json_str)
     
     # 2. Extract content between first { and last }
     start = json_str.find('{')
@@ -402,8 +478,7 @@ def clean_json_string(json_str: str) -> str:
         return json_str
 
     # 3. Fix trailing commas (common error)
-    json_str = re.sub(r',\s*}', '}', json_str)
-    json_str = re.sub(r',\s*]', ']', json_str)
+    json_str = _TRAILING_COMMA_RE.sub(r'\1', json_str)
     
     # 4. Attempt to fix single quotes to double quotes for keys/values
     if "'" in json_str and '"' not in json_str:
@@ -413,49 +488,9 @@ def clean_json_string(json_str: str) -> str:
         json_str = json_str.replace('I"m', "I'm").replace('it"s', "it's").replace('don"t', "don't")
 
     # 5. Fix Python constants to JSON constants — ONLY outside quoted strings.
-    # Walk through the string tracking whether we're inside quotes.
-    def _fix_python_constants(s: str) -> str:
-        result = []
-        in_string = False
-        escape_next = False
-        i = 0
-        while i < len(s):
-            ch = s[i]
-            if escape_next:
-                result.append(ch)
-                escape_next = False
-                i += 1
-                continue
-            if ch == '\\':
-                escape_next = True
-                result.append(ch)
-                i += 1
-                continue
-            if ch == '"':
-                in_string = not in_string
-                result.append(ch)
-                i += 1
-                continue
-            if in_string:
-                result.append(ch)
-                i += 1
-                continue
-            # Outside string — check for True/False/None as standalone words
-            for py_val, json_val in [('True', 'true'), ('False', 'false'), ('None', 'null')]:
-                if s[i:i+len(py_val)] == py_val:
-                    # Verify it's a whole word (not part of a larger identifier)
-                    before_ok = (i == 0 or s[i-1] in ' ,:[')
-                    after_pos = i + len(py_val)
-                    after_ok = (after_pos >= len(s) or s[after_pos] in ' ,]}\n\r')
-                    if before_ok and after_ok:
-                        result.append(json_val)
-                        i += len(py_val)
-                        break
-            else:
-                result.append(ch)
-                i += 1
-        return ''.join(result)
-    json_str = _fix_python_constants(json_str)
+    # One regex pass: quoted strings and escapes match as protected tokens and are
+    # copied unchanged, so True/False/None only get rewritten between them.
+    json_str = _PY_CONSTANT_RE.sub(_fix_python_constant, json_str)
 
     return json_str
 
@@ -465,7 +500,7 @@ def parse_response_json(raw_response: str) -> Optional[Dict[str, Any]]:
         return None
     try:
         cleaned_json = clean_json_string(raw_response)
-        return json.loads(cleaned_json)
+        return _loads(cleaned_json)
     except Exception:
         return None
 
@@ -496,44 +531,63 @@ def trim_response_text(text: str, max_chars: int = 320, max_sentences: int = 2)
     return cleaned
 
 
+_KEY_CLEAN_RE = re.compile(r'[^a-zA-Z0-9\s]+')
+_OTP_WORD_RE = re.compile(r'\botp\b')
+_NEGATION_RE = re.compile(r'\b(nahi|not|didn\'t|did not)\b')
+
+
+def _key_words(text: str) -> List[str]:
+    return _KEY_CLEAN_RE.sub(' ', text.lower()).split()
+
+
 def get_prefix_key(text: str, word_count: int = 8) -> str:
-    cleaned = re.sub(r'[^a-zA-Z0-9\s]+', ' ', text.lower())
-    words = cleaned.split()
-    return " ".join(words[:word_count])
+    return " ".join(_key_words(text)[:word_count])
 
 
 def get_suffix_key(text: str, word_count: int = 8) -> str:
     """Get the last N words of a response for suffix-level repetition check."""
-    cleaned = re.sub(r'[^a-zA-Z0-9\s]+', ' ', text.lower())
-    words = cleaned.split()
+    words = _key_words(text)
     return " ".join(words[-word_count:]) if len(words) >= word_count else " ".join(words)
 
 
+@lru_cache(maxsize=1024)
+def _reply_profile(text: str) -> Tuple[str, str, bool, bool]:
+    """(prefix key, suffix key, starts with 'arre baba', mentions OTP) for one reply.
+    Recent agent replies are re-checked on every turn, so each text is profiled once.
+    """
+    words = _key_words(text)
+    lowered = text.lower()
+    return (
+        " ".join(words[:8]),
+        " ".join(words[-8:]),
+        lowered.strip().startswith("arre baba"),
+        _OTP_WORD_RE.search(lowered) is not None,
+    )
+
+
 def is_repetitive_response(response: str, conversation_history: List[Dict[str, str]], session_id: str) -> bool:
     recent_assistant = [
-        msg.get("text", "")
+        _reply_profile(msg.get("text", ""))
         for msg in conversation_history
         if msg.get("sender") == "agent"
     ][-3:]  # Check last 3 agent replies (was 2)
-    response_lower = response.lower().strip()
-    response_prefix = get_prefix_key(response)
-    response_suffix = get_suffix_key(response)
-    if any(response_prefix and response_prefix == get_prefix_key(prev) for prev in recent_assistant):
+    response_prefix, response_suffix, response_arre_baba, response_otp = _reply_profile(response)
+    if response_prefix and any(response_prefix == prev[0] for prev in recent_assistant):
         return True
     # NEW: Also check if the SUFFIX (last 8 words) matches any recent reply
     # This catches cases like "Aapka poora naam kya hai?" appended to every response
     suffix_match_count = sum(
         1 for prev in recent_assistant
-        if response_suffix and response_suffix == get_suffix_key(prev)
+        if response_suffix and response_suffix == prev[1]
     )
     if suffix_match_count >= 2:  # Same ending in 2+ of last 3 replies = repetitive
         return True
     if response in get_used_responses(session_id):
         return True
-    if response_lower.startswith("arre baba") and any(prev.lower().strip().startswith("arre baba") for prev in recent_assistant):
+    if response_arre_baba and any(prev[2] for prev in recent_assistant):
         return True
-    otp_loop = re.search(r'\botp\b', response.lower()) and re.search(r'\b(nahi|not|didn\'t|did not)\b', response.lower())
-    if otp_loop and any(re.search(r'\botp\b', prev.lower()) for prev in recent_assistant):
+    otp_loop = response_otp and _NEGATION_RE.search(response.lower())
+    if otp_loop and any(prev[3] for prev in recent_assistant):
         return True
     return False
 
@@ -49,3 +49,7 @@ CREATE INDEX IF NOT EXISTS idx_personas_session_id ON personas(session_id);
 CREATE INDEX IF NOT EXISTS idx_conversations_session_id ON conversations(session_id);
 CREATE INDEX IF NOT EXISTS idx_intelligence_session_id ON intelligence(session_id);
 CREATE INDEX IF NOT EXISTS idx_intelligence_callback ON intelligence(callback_sent) WHERE callback_sent = FALSE;
+
+-- One intelligence row per session: save_intelligence upserts on session_id
+-- (on existing tables, remove duplicate session rows before creating this)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_intelligence_session_id ON intelligence(session_id);
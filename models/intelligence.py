@@ -4,7 +4,8 @@ Regex-based extraction of bank accounts, UPI IDs, phone numbers, etc.
 """
 
 import re
-from typing import Dict, List, Any
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple
 
 
 # Regex patterns for intelligence extraction
@@ -27,6 +28,33 @@ PATTERNS = {
     "pan": r'\b[A-Z]{5}\d{4}[A-Z]\b',
 }
 
+# Compiled once at import so extractors skip re's per-call pattern cache lookup
+_UPI_RE = re.compile(PATTERNS["upi"], re.IGNORECASE)
+_EMAIL_RE = re.compile(PATTERNS["email"], re.IGNORECASE)
+_BANK_ACCOUNT_RE = re.compile(PATTERNS["bank_account"])
+_IFSC_RE = re.compile(PATTERNS["ifsc"])
+_PHONE_RE = re.compile(PATTERNS["phone"])
+_URL_RE = re.compile(PATTERNS["url"])
+_URL_SHORTENER_RE = re.compile(PATTERNS["url_shortener"], re.IGNORECASE)
+_WHATSAPP_RE = re.compile(PATTERNS["whatsapp"])
+_FAKE_CREDENTIAL_RE = re.compile(PATTERNS["fake_credential"], re.IGNORECASE)
+_AADHAAR_RE = re.compile(PATTERNS["aadhaar"])
+_PAN_RE = re.compile(PATTERNS["pan"])
+
+# Helper patterns for context checks and cleanup
+_TEN_DIGITS_RE = re.compile(r'\b(\d{10})\b')
+_EMP_ID_RE = re.compile(r'\b[Ee]mp\d+[a-zA-Z]*\d*\b')
+_AADHAAR_CONTEXT_RE = re.compile(r'\b(aadhaar|aadhar|uid|uidai|adhar|identity|id proof|verification)\b')
+_EMAIL_WORD_RE = re.compile(r'\bemail\b')
+_UPI_HANDLE_RE = re.compile(r'^[a-z0-9.-]+$')
+_NON_UPI_CHAR_RE = re.compile(r'[^\w@.-]')
+_NON_PHONE_CHAR_RE = re.compile(r'[^\d+]')
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+_WHITESPACE_RE = re.compile(r'\s+')
+_WORD_RE = re.compile(r'\w+')
+_DIGIT_RE = re.compile(r'\d')
+_TEN_DIGIT_RUN_RE = re.compile(r'\d{10}')
+
 # Suspicious keywords indicating scam
 SCAM_KEYWORDS = [
     # Urgency
@@ -64,6 +92,12 @@ SCAM_KEYWORDS = [
     "claim", "pending", "approved", "eligible",
 ]
 
+_SCAM_KEYWORD_SET = frozenset(SCAM_KEYWORDS)
+
+# (keyword, is_phrase) - single words are looked up in the message's word set,
+# which matches exactly what a \bword\b search would; phrases stay substring checks
+_KEYWORD_MATCHERS = tuple((kw, " " in kw) for kw in SCAM_KEYWORDS)
+
 # Known Indian bank names for extraction from scammer messages
 INDIAN_BANK_NAMES = {
     "sbi": "State Bank of India",
@@ -94,6 +128,9 @@ INDIAN_BANK_NAMES = {
     "post office": "India Post Payments Bank",
 }
 
+# Same shape as _KEYWORD_MATCHERS, for bank-name lookups
+_BANK_NAME_MATCHERS = tuple((bank_key, " " in bank_key) for bank_key in INDIAN_BANK_NAMES)
+
 
 UPI_HANDLES = {
     "ybl", "oksbi", "okicici", "okhdfcbank", "okaxis", "paytm", "axl", "ibl",
@@ -109,6 +146,10 @@ ACCOUNT_CONTEXT_KEYWORDS = [
     "ifsc", "branch", "passbook", "cheque",
 ]
 
+# Positive indicators that strongly suggest a number is a phone number
+# If these are present, they override the "account" context exclusion
+PHONE_INDICATOR_KEYWORDS = ("phone", "call", "mob", "mobile", "whatsapp", "contact", "sms", "text")
+
 # Context keywords that indicate surrounding text is about phone numbers
 PHONE_CONTEXT_KEYWORDS = [
     "call", "phone", "mobile", "contact", "whatsapp", "sms", "helpline",
@@ -121,7 +162,7 @@ def normalize_upi_ids(items: List[str], allow_unknown: bool = False) -> List[str
     for item in items:
         if not item:
             continue
-        candidate = re.sub(r'[^\w@.-]', '', item.strip().lower())
+        candidate = _NON_UPI_CHAR_RE.sub('', item.strip().lower())
         if candidate.count("@") != 1:
             continue
         user, handle = candidate.split("@", 1)
@@ -153,20 +194,28 @@ def _deduplicate(items: List[str]) -> List[str]:
     return result
 
 
+def _scan_at_tokens(text: str):
+    """Return (@-token matches, email matches); both need an '@', so skip the scans without one."""
+    if "@" not in text:
+        return [], []
+    return _UPI_RE.findall(text), _EMAIL_RE.findall(text)
+
+
 def extract_upi_ids(text: str) -> List[str]:
     """Extract UPI IDs like name@handle or phone@handle."""
-    matches = re.findall(PATTERNS["upi"], text, re.IGNORECASE)
-    
-    # Filter out obvious emails before UPI processing
-    email_matches = set(re.findall(PATTERNS["email"], text, re.IGNORECASE))
-    
+    return _upi_ids_from(*_scan_at_tokens(text))
+
+
+def _upi_ids_from(matches: List[str], email_matches: List[str]) -> List[str]:
+    """UPI filtering over already-scanned @-tokens and email matches."""
+    email_set = {e.lower() for e in email_matches}
     normalized = []
     for candidate in matches:
         if "@" not in candidate:
             continue
             
         # If this exact match is also found as an email, check if it's a known UPI handle
-        if candidate.lower() in {e.lower() for e in email_matches}:
+        if candidate.lower() in email_set:
             _, handle = candidate.lower().split("@", 1)
             # Only accept as UPI if it uses a known UPI handle (like @ybl, @oksbi)
             # If it's a generic domain (sbi.co.in) and matches email pattern, it's likely just an email
@@ -179,7 +228,7 @@ def extract_upi_ids(text: str) -> List[str]:
         
         handle = handle.lower()
         # Basic validation: handle shouldn't contain spaces or unusual characters
-        if not re.match(r'^[a-z0-9.-]+$', handle):
+        if not _UPI_HANDLE_RE.match(handle):
             continue
             
         normalized.append(f"{user}@{handle}")
@@ -198,7 +247,7 @@ def _has_context(text: str, position: int, keywords: List[str], window: int = 80
 def extract_bank_accounts(text: str) -> List[str]:
     """Extract bank account numbers (10-16 digits) with context validation."""
     valid = []
-    for m in re.finditer(PATTERNS["bank_account"], text):
+    for m in _BANK_ACCOUNT_RE.finditer(text):
         acc = m.group(0)
         # Context check to avoid phone numbers (most Indian accounts are > 10 digits)
         # or if 10 digits, they usually don't start with 6-9 unless it's a phone-linked account
@@ -213,9 +262,16 @@ def extract_bank_accounts(text: str) -> List[str]:
     return _deduplicate(valid)
 
 
+def _scan_ifsc(text: str) -> List[str]:
+    """Raw IFSC matches. The fixed 5th character is always '0', so text without one can't match."""
+    if "0" not in text:
+        return []
+    return _IFSC_RE.findall(text.upper())
+
+
 def extract_ifsc_codes(text: str) -> List[str]:
     """Extract IFSC codes."""
-    return _deduplicate(re.findall(PATTERNS["ifsc"], text.upper()))
+    return _deduplicate(_scan_ifsc(text))
 
 
 def normalize_phone_numbers(items: List[str]) -> List[str]:
@@ -224,7 +280,7 @@ def normalize_phone_numbers(items: List[str]) -> List[str]:
     for item in items:
         if not item:
             continue
-        clean = re.sub(r'[^\d+]', '', str(item))
+        clean = _NON_PHONE_CHAR_RE.sub('', str(item))
         # Handle +91 prefix
         if clean.startswith('+91'):
             clean = clean[3:]
@@ -245,38 +301,36 @@ def normalize_bank_accounts(items: list) -> list:
     Filters out short fragments (< 10 digits) that LLM may incorrectly extract.
     E.g., 'account ending with 3456' → '3456' is NOT a valid bank account.
     """
-    valid = []
-    for item in items:
-        if not item:
-            continue
-        clean = re.sub(r'[^\d]', '', str(item))
-        # Bank accounts must be at least 10 digits
-        if len(clean) >= 10:
-            valid.append(clean)
-    return _deduplicate(valid)
+    cleaned = (_NON_DIGIT_RE.sub('', str(item)) for item in items if item)
+    # dict.fromkeys dedupes in order; bank accounts must be at least 10 digits
+    return [acc for acc in dict.fromkeys(cleaned) if len(acc) >= 10]
 
 
 def extract_phone_numbers(text: str) -> List[str]:
     """Extract phone numbers - enhanced to catch more formats.
     Skips 10-digit numbers in bank-account context to avoid cross-contamination.
     """
+    # Both passes below need ten contiguous digits; one search rules out most messages
+    if _TEN_DIGIT_RUN_RE.search(text) is None:
+        return []
     matches = []
-    
-    # Positive indicators that strongly suggest a number is a phone number
-    # If these are present, they override the "account" context exclusion
-    phone_indicators = ["phone", "call", "mob", "mobile", "whatsapp", "contact", "sms", "text"]
+    # Digits of everything accepted so far, so the secondary pass can skip repeats in O(1)
+    seen_digits = set()
+    phone_indicators = PHONE_INDICATOR_KEYWORDS
     
     # Primary phone pattern (captures +91 prefixed and 6-9 starting numbers)
-    for m in re.finditer(PATTERNS["phone"], text):
+    for m in _PHONE_RE.finditer(text):
         raw = m.group()
         # If it has explicit phone formatting (+ prefix), accept it immediately
         # phone numbers with + are never bank accounts
+        digits = _NON_DIGIT_RE.sub('', raw)
         if raw.strip().startswith('+'):
             matches.append(raw)
+            seen_digits.add(digits)
             continue
             
         # Strip country-code prefix to get the core 10-digit number
-        core = re.sub(r'[^\d]', '', raw)
+        core = digits
         if core.startswith('91') and len(core) == 12:
             core = core[2:]
             
@@ -286,22 +340,21 @@ def extract_phone_numbers(text: str) -> List[str]:
             # Check if it has phone-like separators (dashes/spaces) - if so, it's likely a phone
             has_separators = '-' in raw or ' ' in raw
             
-            # Check for positive phone indicators immediately preceding the number
-            has_phone_indicator = _has_context(text, m.start(), phone_indicators, window=25)
-            
             # If it's a bare block of digits closely associated with account keywords, skip it
-            # UNLESS it has a strong phone indicator
-            if not has_separators and not has_phone_indicator:
+            # UNLESS it has a strong phone indicator immediately preceding the number
+            # (context windows are only scanned when there are no separators)
+            if not has_separators and not _has_context(text, m.start(), phone_indicators, window=25):
                 if _has_context(text, m.start(), ACCOUNT_CONTEXT_KEYWORDS, window=50):
                     continue  # Skip — likely a bank account
         
         matches.append(raw)
+        seen_digits.add(digits)
     
     # Secondary: catch standalone 10-digit sequences not already found
-    for m in re.finditer(r'\b(\d{10})\b', text):
+    for m in _TEN_DIGITS_RE.finditer(text):
         num = m.group(1)
         # Avoid duplicates (raw or core)
-        if num not in matches and num not in [re.sub(r'[^\d]', '', m) for m in matches]:
+        if num not in seen_digits:
             
             # Check for positive phone indicators
             has_phone_indicator = _has_context(text, m.start(), phone_indicators, window=25)
@@ -312,15 +365,16 @@ def extract_phone_numbers(text: str) -> List[str]:
                 continue
                 
             matches.append(num)
+            seen_digits.add(num)
     
     return normalize_phone_numbers(_deduplicate(matches))
 
 
 def extract_fake_credentials(text: str) -> List[str]:
     """Extract fake employee IDs, staff IDs, and similar credentials."""
-    matches = re.findall(PATTERNS["fake_credential"], text, re.IGNORECASE)
+    matches = _FAKE_CREDENTIAL_RE.findall(text)
     # Also look for patterns like "Emp123sumit"
-    additional = re.findall(r'\b[Ee]mp\d+[a-zA-Z]*\d*\b', text)
+    additional = _EMP_ID_RE.findall(text)
     return _deduplicate([m.strip() for m in matches + additional if m.strip()])
 
 
@@ -329,21 +383,18 @@ def extract_aadhaar_numbers(text: str) -> List[str]:
     Formats: 1234 5678 9012, 1234-5678-9012, 123456789012
     Filters out numbers that could be phone numbers or bank accounts.
     """
-    matches = re.findall(PATTERNS["aadhaar"], text)
+    matches = _AADHAAR_RE.findall(text)
+    # Aadhaar-related keywords anywhere in the text (same answer for every match)
+    aadhaar_context = _AADHAAR_CONTEXT_RE.search(text.lower()) if matches else None
     result = []
     for m in matches:
         # Clean to digits only
-        digits = re.sub(r'[^\d]', '', m)
+        digits = _NON_DIGIT_RE.sub('', m)
         if len(digits) != 12:
             continue
         # Filter: Aadhaar cannot start with 0 or 1
         if digits[0] in ('0', '1'):
             continue
-        # Check context: look for Aadhaar-related keywords nearby
-        aadhaar_context = re.search(
-            r'\b(aadhaar|aadhar|uid|uidai|adhar|identity|id proof|verification)\b',
-            text.lower()
-        )
         # If the number starts with 2-9 and has Aadhaar context, or if it clearly
         # doesn't look like a phone or bank account, accept it
         if aadhaar_context or (not text.strip().replace(' ', '').replace('-', '').isdigit()):
@@ -355,7 +406,7 @@ def extract_pan_numbers(text: str) -> List[str]:
     """Extract PAN card numbers (Indian tax ID).
     Format: ABCDE1234F (5 letters, 4 digits, 1 letter)
     """
-    matches = re.findall(PATTERNS["pan"], text.upper())
+    matches = _PAN_RE.findall(text.upper())
     result = []
     for m in matches:
         # Validate PAN structure:
@@ -366,64 +417,85 @@ def extract_pan_numbers(text: str) -> List[str]:
     return _deduplicate(result)
 
 
-def extract_case_ids(text: str) -> List[str]:
-    """Extract case/reference IDs from scammer messages.
-    Patterns: Case #12345, Ref ID: ABC-789, FIR No. 123/2026, Reference: XYZ123,
-    Case ID: CUS-4521, Badge #ABC-123, Ticket No. TKT-456
+def _extract_reference_ids(text: str, patterns, prefixed=None) -> List[str]:
+    """Run each compiled pattern and collect its first group as an ID.
+    ``patterns`` pairs each regex with the literals it needs; a pattern is only
+    run when one of them is in the casefolded text, so ordinary chat skips it.
+    ``prefixed`` is a combined fixed-prefix pattern (see _prefixed_id_re) whose
+    matches are appended after the others, bucketed back into prefix order.
     """
-    patterns = [
-        r'(?:case|ref(?:erence)?|fir|complaint|ticket|badge|incident)\s*(?:no\.?|number|id|#|:)\s*[:\s#-]*([A-Z0-9][A-Z0-9/_-]{2,20})',
-        r'#\s*([A-Z]{2,5}-\d{3,10})',
-        r'(?:FIR|CR)\s*(?:No\.?)?\s*[:\s]*([\d]+/[\d]{4})',
-    ]
     results = []
-    for pat in patterns:
-        for m in re.finditer(pat, text, re.IGNORECASE):
+    folded = text.casefold()
+    for hints, pat in patterns:
+        if not any(hint in folded for hint in hints):
+            continue
+        for m in pat.finditer(text):
             val = m.group(1).strip().strip(':').strip()
             if val and len(val) >= 3:
                 results.append(val)
+    # Every PREFIX-digits ID contains a '-'
+    if prefixed is not None and "-" in text:
+        buckets = {name: [] for name in prefixed.groupindex}
+        for m in prefixed.finditer(text):
+            buckets[m.lastgroup].append(m.group())
+        for bucket in buckets.values():
+            results.extend(bucket)
     return _deduplicate(results)
 
 
+def _prefixed_id_re(prefixes, min_digits: int):
+    """One alternation over PREFIX-digits IDs, one named group per prefix.
+    The prefixes never overlap, so a single scan finds the same matches
+    as one pattern per prefix.
+    """
+    return re.compile(
+        "|".join(rf'\b(?P<{p}>{p}-\d{{{min_digits},10}})\b' for p in prefixes),
+        re.IGNORECASE,
+    )
+
+
+_CASE_ID_PATTERNS = tuple((hints, re.compile(p, re.IGNORECASE)) for hints, p in (
+    (("case", "ref", "fir", "complaint", "ticket", "badge", "incident"),
+     r'(?:case|ref(?:erence)?|fir|complaint|ticket|badge|incident)\s*(?:no\.?|number|id|#|:)\s*[:\s#-]*([A-Z0-9][A-Z0-9/_-]{2,20})'),
+    (("#",), r'#\s*([A-Z]{2,5}-\d{3,10})'),
+    (("fir", "cr"), r'(?:FIR|CR)\s*(?:No\.?)?\s*[:\s]*([\d]+/[\d]{4})'),
+))
+
+
+def extract_case_ids(text: str) -> List[str]:
+    """Extract case/reference IDs from scammer messages.
+    Patterns: Case #12345, Ref ID: ABC-789, FIR No. 123/2026, Reference: XYZ123,
+    Case ID: CUS-4521, Badge #ABC-123, Ticket No. TKT-456
+    """
+    return _extract_reference_ids(text, _CASE_ID_PATTERNS)
+
+
+_POLICY_NUMBER_PATTERNS = tuple((hints, re.compile(p, re.IGNORECASE)) for hints, p in (
+    (("policy", "insurance"),
+     r'(?:policy|insurance)\s*(?:no\.?|number|id|#|:)\s*[:\s#-]*([A-Z0-9][A-Z0-9/_-]{3,20})'),
+))
+_POLICY_PREFIXED_RE = _prefixed_id_re(("LIC", "INS", "POL"), 4)
+
+
 def extract_policy_numbers(text: str) -> List[str]:
     """Extract insurance/policy numbers.
     Patterns: Policy #LIC-482901, Policy No. 123456, Insurance ID: INS-789
     """
-    patterns = [
-        r'(?:policy|insurance)\s*(?:no\.?|number|id|#|:)\s*[:\s#-]*([A-Z0-9][A-Z0-9/_-]{3,20})',
-        r'\b(LIC-\d{4,10})\b',
-        r'\b(INS-\d{4,10})\b',
-        r'\b(POL-\d{4,10})\b',
-    ]
-    results = []
-    for pat in patterns:
-        for m in re.finditer(pat, text, re.IGNORECASE):
-            val = m.group(1).strip().strip(':').strip()
-            if val and len(val) >= 3:
-                results.append(val)
-    return _deduplicate(results)
+    return _extract_reference_ids(text, _POLICY_NUMBER_PATTERNS, _POLICY_PREFIXED_RE)
+
+
+_ORDER_NUMBER_PATTERNS = tuple((hints, re.compile(p, re.IGNORECASE)) for hints, p in (
+    (("order", "tracking", "parcel", "shipment", "consignment"),
+     r'(?:order|tracking|parcel|shipment|consignment)\s*(?:no\.?|number|id|#|:)\s*[:\s#-]*([A-Z0-9][A-Z0-9/_-]{3,20})'),
+))
+_ORDER_PREFIXED_RE = _prefixed_id_re(("FK", "ORD", "IND", "PKG", "AWB", "TRK"), 3)
 
 
 def extract_order_numbers(text: str) -> List[str]:
     """Extract order/tracking/parcel IDs.
     Patterns: Order #FK-8823, Order ID: ORD-123, Tracking: IND-29384, Parcel #PKG-456
     """
-    patterns = [
-        r'(?:order|tracking|parcel|shipment|consignment)\s*(?:no\.?|number|id|#|:)\s*[:\s#-]*([A-Z0-9][A-Z0-9/_-]{3,20})',
-        r'\b(FK-\d{3,10})\b',
-        r'\b(ORD-\d{3,10})\b',
-        r'\b(IND-\d{3,10})\b',
-        r'\b(PKG-\d{3,10})\b',
-        r'\b(AWB-\d{3,10})\b',
-        r'\b(TRK-\d{3,10})\b',
-    ]
-    results = []
-    for pat in patterns:
-        for m in re.finditer(pat, text, re.IGNORECASE):
-            val = m.group(1).strip().strip(':').strip()
-            if val and len(val) >= 3:
-                results.append(val)
-    return _deduplicate(results)
+    return _extract_reference_ids(text, _ORDER_NUMBER_PATTERNS, _ORDER_PREFIXED_RE)
 
 
 # IFSC code prefix → bank short name mapping
@@ -458,20 +530,18 @@ def extract_mentioned_banks(text: str) -> List[str]:
     Returns lowercase short names of identified banks.
     Also extracts bank names from IFSC code prefixes (e.g., HDFC from HDFC0001234).
     """
-    text_lower = text.lower()
+    return _mentioned_banks_from(*_lowered_words(text), _scan_ifsc(text))
+
+
+def _mentioned_banks_from(text_lower: str, words: set, ifsc_codes: List[str]) -> List[str]:
+    """Bank-name lookup over the lowercased text/word set plus already-scanned IFSC codes."""
     found = []
-    for bank_key in INDIAN_BANK_NAMES:
-        # Use word boundary for short bank names, substring for multi-word
-        if " " in bank_key:
-            if bank_key in text_lower:
-                found.append(bank_key)
-        else:
-            pattern = r'\b' + re.escape(bank_key) + r'\b'
-            if re.search(pattern, text_lower):
-                found.append(bank_key)
+    for bank_key, is_phrase in _BANK_NAME_MATCHERS:
+        # Whole-word match for short bank names, substring for multi-word
+        if (bank_key in text_lower) if is_phrase else (bank_key in words):
+            found.append(bank_key)
 
     # Also extract bank names from IFSC code prefixes
-    ifsc_codes = re.findall(PATTERNS["ifsc"], text.upper())
     for ifsc in ifsc_codes:
         prefix = ifsc[:4]
         if prefix in IFSC_PREFIX_TO_BANK:
@@ -484,15 +554,16 @@ def extract_mentioned_banks(text: str) -> List[str]:
 
 def extract_urls(text: str) -> List[str]:
     """Extract URLs (potential phishing links), including protocol-less shortener URLs."""
-    urls = re.findall(PATTERNS["url"], text)
+    # Every URL pattern (scheme, shortener path, wa.me) needs a '/'
+    if "/" not in text:
+        return []
+    urls = _URL_RE.findall(text)
     # Capture shortener URLs without http:// prefix
-    shortener_urls = re.findall(PATTERNS["url_shortener"], text, re.IGNORECASE)
-    # Reconstruct full shortener match from capture
-    for match in re.finditer(PATTERNS["url_shortener"], text, re.IGNORECASE):
+    for match in _URL_SHORTENER_RE.finditer(text):
         full_match = match.group(0)
         if full_match not in urls:
             urls.append(full_match)
-    whatsapp = re.findall(PATTERNS["whatsapp"], text)
+    whatsapp = _WHATSAPP_RE.findall(text)
     # Clean trailing punctuation from URLs
     cleaned = []
     for url in _deduplicate(urls + whatsapp):
@@ -507,13 +578,15 @@ def extract_emails(text: str) -> List[str]:
     Also captures addresses with non-TLD domains (like 'fakebank')
     when the word 'email' appears nearby in the text.
     """
-    matches = re.findall(PATTERNS["email"], text, re.IGNORECASE)
-    # Also check for @-patterns that the email regex misses (no TLD domains)
-    at_patterns = re.findall(PATTERNS["upi"], text, re.IGNORECASE)
-    
+    # Also check @-patterns that the email regex misses (no TLD domains)
+    at_patterns, matches = _scan_at_tokens(text)
     # Check if 'email' keyword appears in text
-    has_email_context = bool(re.search(r'\bemail\b', text.lower()))
-    
+    has_email_context = bool(_EMAIL_WORD_RE.search(text.lower()))
+    return _emails_from(matches, at_patterns, has_email_context)
+
+
+def _emails_from(matches: List[str], at_patterns: List[str], has_email_context: bool) -> List[str]:
+    """Email filtering over already-scanned email matches and @-tokens."""
     emails = []
     # Process standard email matches (these have TLDs, so we trust them more)
     for m in matches:
@@ -548,30 +621,35 @@ def extract_emails(text: str) -> List[str]:
     return _deduplicate(emails)
 
 
+def _lowered_words(text: str):
+    """Lowercase the text once and collect its word set for whole-word lookups."""
+    text_lower = text.lower()
+    return text_lower, set(_WORD_RE.findall(text_lower))
+
+
 def extract_keywords(text: str) -> List[str]:
     """Extract scam-related keywords using word-boundary matching."""
-    text_lower = text.lower()
+    return _keywords_from(*_lowered_words(text))
+
+
+def _keywords_from(text_lower: str, words: set) -> List[str]:
+    """Keyword lookup over the lowercased text and its word set."""
+    # Whole-word lookups avoid partial matches like "snow" matching "now"
     found = []
-    for keyword in SCAM_KEYWORDS:
-        # Use word boundary for single words, substring for multi-word phrases
-        if " " in keyword:
-            if keyword in text_lower:
-                found.append(keyword)
-        else:
-            # Check with word boundary to avoid partial matches like "snow" matching "now"
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            if re.search(pattern, text_lower):
-                found.append(keyword)
+    for keyword, is_phrase in _KEYWORD_MATCHERS:
+        # Substring for multi-word phrases, whole word for single words
+        if (keyword in text_lower) if is_phrase else (keyword in words):
+            found.append(keyword)
     return found
 
 
 def normalize_keywords(items: List[str]) -> List[str]:
     normalized = []
-    keyword_set = set(SCAM_KEYWORDS)
+    keyword_set = _SCAM_KEYWORD_SET
     for item in items:
         if not item:
             continue
-        candidate = re.sub(r'\s+', ' ', str(item).strip().lower())
+        candidate = _WHITESPACE_RE.sub(' ', str(item).strip().lower())
         if candidate in keyword_set:
             normalized.append(candidate)
     return _deduplicate(normalized)
@@ -587,25 +665,66 @@ def extract_all_intelligence(text: str) -> Dict[str, Any]:
     Returns:
         Dict with all extracted intelligence
     """
-    return {
-        "upi_ids": extract_upi_ids(text),
-        "bank_accounts": extract_bank_accounts(text),
-        "emails": extract_emails(text),
-        "ifsc_codes": extract_ifsc_codes(text),
-        "phone_numbers": extract_phone_numbers(text),
+    # Cached per text (history messages are re-extracted every turn);
+    # fresh lists each call so callers can mutate the result safely
+    return {key: list(values) for key, values in _extract_all_cached(text)}
+
+
+@lru_cache(maxsize=1024)
+def _extract_all_cached(text: str) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """Run every extractor once and freeze the result for lru_cache."""
+    # UPI/email and IFSC/bank-name extraction read the same matches,
+    # so scan for them once here and share the results
+    at_matches, email_matches = _scan_at_tokens(text)
+    ifsc_codes = _scan_ifsc(text)
+    # Keywords, bank names and the 'email' context check all read the lowercased words
+    text_lower, words = _lowered_words(text)
+    # Most chat turns carry no digits at all; every numeric extractor needs one,
+    # so a single cheap check routes those turns past them
+    if _DIGIT_RE.search(text) is None:
+        bank_accounts = phone_numbers = fake_credentials = aadhaar_numbers = pan_numbers = []
+    else:
+        bank_accounts = extract_bank_accounts(text)
+        phone_numbers = extract_phone_numbers(text)
+        fake_credentials = extract_fake_credentials(text)
+        aadhaar_numbers = extract_aadhaar_numbers(text)
+        pan_numbers = extract_pan_numbers(text)
+    intel = {
+        "upi_ids": _upi_ids_from(at_matches, email_matches),
+        "bank_accounts": bank_accounts,
+        "emails": _emails_from(email_matches, at_matches, "email" in words),
+        "ifsc_codes": _deduplicate(ifsc_codes),
+        "phone_numbers": phone_numbers,
         "phishing_links": extract_urls(text),
-        "suspicious_keywords": extract_keywords(text),
+        "suspicious_keywords": _keywords_from(text_lower, words),
         # Internal field for tracking
-        "fake_credentials": extract_fake_credentials(text),
+        "fake_credentials": fake_credentials,
         # Advanced extraction fields
-        "aadhaar_numbers": extract_aadhaar_numbers(text),
-        "pan_numbers": extract_pan_numbers(text),
-        "mentioned_banks": extract_mentioned_banks(text),
+        "aadhaar_numbers": aadhaar_numbers,
+        "pan_numbers": pan_numbers,
+        "mentioned_banks": _mentioned_banks_from(text_lower, words, ifsc_codes),
         # Evaluation bonus fields
         "case_ids": extract_case_ids(text),
         "policy_numbers": extract_policy_numbers(text),
         "order_numbers": extract_order_numbers(text),
     }
+    return tuple((key, tuple(values)) for key, values in intel.items())
+
+
+_MERGE_FIELDS = (
+    "upi_ids", "bank_accounts", "emails", "ifsc_codes", "phone_numbers",
+    "phishing_links", "suspicious_keywords", "fake_credentials",
+    "aadhaar_numbers", "pan_numbers", "mentioned_banks",
+    "case_ids", "policy_numbers", "order_numbers",
+)
+
+# Fields that are validated (not just deduplicated) when merged
+_MERGE_NORMALIZERS = {
+    "upi_ids": lambda items: normalize_upi_ids(items, allow_unknown=True),
+    "bank_accounts": normalize_bank_accounts,
+    "phone_numbers": normalize_phone_numbers,
+    "suspicious_keywords": normalize_keywords,
+}
 
 
 def merge_intelligence(existing: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
@@ -620,17 +739,11 @@ def merge_intelligence(existing: Dict[str, Any], new: Dict[str, Any]) -> Dict[st
         Merged intelligence dict
     """
     merged = {}
-    for key in ["upi_ids", "bank_accounts", "emails", "ifsc_codes", "phone_numbers",
-                "phishing_links", "suspicious_keywords", "fake_credentials",
-                "aadhaar_numbers", "pan_numbers", "mentioned_banks",
-                "case_ids", "policy_numbers", "order_numbers"]:
-        existing_list = existing.get(key, [])
-        new_list = new.get(key, [])
-        merged[key] = _deduplicate(existing_list + new_list)
-    merged["upi_ids"] = normalize_upi_ids(merged.get("upi_ids", []), allow_unknown=True)
-    merged["bank_accounts"] = normalize_bank_accounts(merged.get("bank_accounts", []))
-    merged["phone_numbers"] = normalize_phone_numbers(merged.get("phone_numbers", []))
-    merged["suspicious_keywords"] = normalize_keywords(merged.get("suspicious_keywords", []))
+    for key in _MERGE_FIELDS:
+        combined = [*existing.get(key, ()), *new.get(key, ())]
+        # Normalizers skip empties and deduplicate themselves, so one pass is enough
+        normalize = _MERGE_NORMALIZERS.get(key, _deduplicate)
+        merged[key] = normalize(combined)
     return merged
 
 
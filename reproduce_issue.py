@@ -3,9 +3,14 @@ import logging
 import sys
 import os
 
+from dotenv import load_dotenv
+
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Project modules read their settings at import time and no longer load .env themselves
+load_dotenv()
+
 from core.llm_client import clean_json_string
 
 # Mock logger
@@ -0,0 +1,11 @@
+"""
+Project root path setup, shared by pytest modules and the manual scripts in tests/.
+Importing it puts the root on sys.path once per process so core/, models/, utils/ resolve.
+"""
+
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
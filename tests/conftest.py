@@ -0,0 +1,27 @@
+"""
+Shared pytest setup for the tests/ directory.
+Puts the project root on sys.path so test modules can import core/, models/, utils/.
+"""
+
+import _path_setup  # noqa: F401
+
+from dotenv import load_dotenv
+
+# app.py loads .env for the server; tests import project modules directly
+load_dotenv()
+
+# Manual scripts (run with `python tests/<name>.py`): no test functions, and
+# importing them only costs collection time
+collect_ignore = [
+    "test_advanced_conversation.py",
+    "test_guvi_scenarios.py",
+    "test_llm_connection.py",
+    "test_local_api.py",
+    "test_remote_api.py",
+    "test_wa_send.py",
+]
+
+
+def pytest_configure(config):
+    # Tests that talk to a live server; skip them with: pytest -m "not network"
+    config.addinivalue_line("markers", "network: needs a running honeypot API (deselect with -m 'not network')")
@@ -1,6 +1,5 @@
 """Validate fixes with GUVI's EXACT substring matching logic."""
-import sys, os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _path_setup  # noqa: F401  (puts the project root on sys.path)
 from models.intelligence import (
     extract_upi_ids, extract_bank_accounts, extract_phone_numbers,
     extract_urls, extract_emails, extract_keywords, extract_mentioned_banks
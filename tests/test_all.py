@@ -1,15 +1,27 @@
 """
 Comprehensive Test Suite for Operation Iron-Mask
 Tests all 12 scam archetypes, intelligence extraction, and persona consistency
+
+Under pytest each archetype is its own test node, so they can be spread
+across workers with pytest-xdist:
+    RUN_INTEGRATION_TESTS=true pytest -n 12 tests/test_all.py
 """
 
 import os
-import requests
+import sys
+import asyncio
+import httpx
 import json
+import re
 import time
 import pytest
 from datetime import datetime
 
+try:
+    import orjson  # Optional: faster payload encoding/decoding for the test client
+except ImportError:
+    orjson = None
+
 API_URL = "http://127.0.0.1:5000/api/honey-pot"
 API_KEY = "sk_ironmask_hackathon_2026"
 HEADERS = {
@@ -18,6 +30,10 @@ HEADERS = {
 }
 RUN_INTEGRATION = os.getenv("RUN_INTEGRATION_TESTS") == "true"
 
+# Every test here drives the live API
+pytestmark = pytest.mark.network
+FAST_TIMEOUT = 8  # Happy-path budget (~p99 of a healthy LLM turn); fail fast on a wedged server
+
 # Test cases for all 12 scam archetypes
 TEST_CASES = [
     {
@@ -95,9 +111,39 @@ TEST_CASES = [
 ]
 
 
-def run_test(test_case):
-    """Run a single test case and return results."""
-    payload = {
+def encode_body(payload) -> bytes:
+    """Serialize a request body once, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def decode_body(content: bytes):
+    """Parse a response body, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _any_of(words, flags=0):
+    """Compile one alternation that matches any of the given literal strings."""
+    return re.compile("|".join(re.escape(w) for w in words), flags)
+
+
+# Precompute expectation matchers once instead of rescanning per response
+for _tc in TEST_CASES:
+    _tc["_upi_set"] = frozenset(_tc.get("expected_upi", []))
+    _tc["_phone_set"] = frozenset(_tc.get("expected_phone", []))
+    if "expected_links" in _tc:
+        _tc["_link_re"] = _any_of(_tc["expected_links"])
+    if "expected_keywords" in _tc:
+        _tc["_kw_re"] = _any_of(_tc["expected_keywords"], re.IGNORECASE)
+del _tc
+
+
+def build_payload(test_case):
+    """Build the honeypot request body for one archetype case."""
+    return {
         "sessionId": test_case["session_id"],
         "message": {
             "sender": "scammer",
@@ -105,44 +151,58 @@ def run_test(test_case):
         },
         "conversationHistory": []
     }
+
+
+def build_result(test_case, data, latency):
+    """Score one honeypot response against the case's expected extractions."""
+    results = {
+        "name": test_case["name"],
+        "status": "PASS" if data.get("scamDetected") else "FAIL",
+        "latency_ms": round(latency * 1000, 2),
+        "scam_detected": data.get("scamDetected"),
+        "reply_preview": data.get("reply", "")[:80] + "...",
+        "extracted_upi": data.get("extractedIntelligence", {}).get("upiIds", []),
+        "extracted_phone": data.get("extractedIntelligence", {}).get("phoneNumbers", []),
+        "extracted_links": data.get("extractedIntelligence", {}).get("phishingLinks", []),
+        "keywords": data.get("extractedIntelligence", {}).get("suspiciousKeywords", [])
+    }
     
+    # Verify expected extractions
+    if "expected_upi" in test_case:
+        found = bool(test_case["_upi_set"].intersection(results["extracted_upi"]))
+        results["upi_extraction"] = "✅" if found else "❌"
+    if "expected_phone" in test_case:
+        found = bool(test_case["_phone_set"].intersection(results["extracted_phone"]))
+        results["phone_extraction"] = "✅" if found else "❌"
+    # Newline-joined so a multi-word expectation cannot match across two entries
+    if "expected_links" in test_case:
+        links_blob = "\n".join(results["extracted_links"])
+        found = bool(test_case["_link_re"].search(links_blob))
+        results["link_extraction"] = "✅" if found else "❌"
+    if "expected_keywords" in test_case:
+        keywords_blob = "\n".join(results["keywords"])
+        found = bool(test_case["_kw_re"].search(keywords_blob))
+        results["keyword_extraction"] = "✅" if found else "❌"
+    
+    return results
+
+
+def make_client() -> httpx.AsyncClient:
+    """Pooled keep-alive client for the live API, with the fail-fast timeout."""
+    return httpx.AsyncClient(headers=HEADERS, timeout=httpx.Timeout(FAST_TIMEOUT, connect=2))
+
+
+async def run_test(client, test_case):
+    """Run a single test case on a shared async client and return results."""
+    payload = build_payload(test_case)
     start_time = time.time()
     
     try:
-        response = requests.post(API_URL, headers=HEADERS, json=payload, timeout=60)
+        response = await client.post(API_URL, content=encode_body(payload))
         latency = time.time() - start_time
         
         if response.status_code == 200:
-            data = response.json()
-            
-            # Check results
-            results = {
-                "name": test_case["name"],
-                "status": "PASS" if data.get("scamDetected") else "FAIL",
-                "latency_ms": round(latency * 1000, 2),
-                "scam_detected": data.get("scamDetected"),
-                "reply_preview": data.get("reply", "")[:80] + "...",
-                "extracted_upi": data.get("extractedIntelligence", {}).get("upiIds", []),
-                "extracted_phone": data.get("extractedIntelligence", {}).get("phoneNumbers", []),
-                "extracted_links": data.get("extractedIntelligence", {}).get("phishingLinks", []),
-                "keywords": data.get("extractedIntelligence", {}).get("suspiciousKeywords", [])
-            }
-            
-            # Verify expected extractions
-            if "expected_upi" in test_case:
-                found = any(upi in results["extracted_upi"] for upi in test_case["expected_upi"])
-                results["upi_extraction"] = "✅" if found else "❌"
-            if "expected_phone" in test_case:
-                found = any(phone in results["extracted_phone"] for phone in test_case["expected_phone"])
-                results["phone_extraction"] = "✅" if found else "❌"
-            if "expected_links" in test_case:
-                found = any(link in str(results["extracted_links"]) for link in test_case["expected_links"])
-                results["link_extraction"] = "✅" if found else "❌"
-            if "expected_keywords" in test_case:
-                found = any(kw.lower() in str(results["keywords"]).lower() for kw in test_case["expected_keywords"])
-                results["keyword_extraction"] = "✅" if found else "❌"
-            
-            return results
+            return build_result(test_case, decode_body(response.content), latency)
         else:
             return {"name": test_case["name"], "status": "ERROR", "error": response.text}
             
@@ -150,9 +210,8 @@ def run_test(test_case):
         return {"name": test_case["name"], "status": "ERROR", "error": str(e)}
 
 
-@pytest.mark.skipif(not RUN_INTEGRATION, reason="Set RUN_INTEGRATION_TESTS=true to run")
-def test_persona_consistency():
-    """Test that personas are consistent across multiple messages."""
+async def check_persona_consistency(client):
+    """Send two turns on one session so the replies can be compared for persona drift."""
     session_id = "test-persona-consistency-final"
     
     # First message
@@ -162,8 +221,8 @@ def test_persona_consistency():
         "conversationHistory": []
     }
     
-    resp1 = requests.post(API_URL, headers=HEADERS, json=payload1, timeout=60)
-    reply1 = resp1.json().get("reply", "")
+    resp1 = await client.post(API_URL, content=encode_body(payload1))
+    reply1 = decode_body(resp1.content).get("reply", "")
     
     # Second message
     payload2 = {
@@ -175,20 +234,19 @@ def test_persona_consistency():
         ]
     }
     
-    resp2 = requests.post(API_URL, headers=HEADERS, json=payload2, timeout=60)
-    reply2 = resp2.json().get("reply", "")
+    resp2 = await client.post(API_URL, content=encode_body(payload2))
+    reply2 = decode_body(resp2.content).get("reply", "")
     
     return {
         "test": "Persona Consistency",
         "first_reply": reply1[:100] + "...",
         "second_reply": reply2[:100] + "...",
-        "status": "PASS (check replies)"
+        "status": "PASS (check replies)" if resp1.status_code == resp2.status_code == 200 else "FAIL"
     }
 
 
-@pytest.mark.skipif(not RUN_INTEGRATION, reason="Set RUN_INTEGRATION_TESTS=true to run")
-def test_latency():
-    """Test API responds within 1 second."""
+async def check_latency(client):
+    """Time one honeypot turn (target: under 1 second)."""
     payload = {
         "sessionId": "latency-test-001",
         "message": {"sender": "scammer", "text": "Quick test message"},
@@ -196,7 +254,7 @@ def test_latency():
     }
     
     start = time.time()
-    response = requests.post(API_URL, headers=HEADERS, json=payload, timeout=60)
+    response = await client.post(API_URL, content=encode_body(payload), timeout=60)
     latency = time.time() - start
     
     return {
@@ -207,7 +265,56 @@ def test_latency():
     }
 
 
+async def run_all_tests(client):
+    """Dispatch all archetype cases concurrently over one pooled client.
+
+    Progress is printed as each case finishes; results keep TEST_CASES order.
+    """
+    tasks = [asyncio.create_task(run_test(client, tc)) for tc in TEST_CASES]
+    for next_done in asyncio.as_completed(tasks):
+        result = await next_done
+        if result.get("status") == "PASS":
+            print(f"  {result['name']}... ✅ ({result.get('latency_ms', 0)}ms)")
+        else:
+            print(f"  {result['name']}... ❌ {result.get('error', '')}")
+    return [task.result() for task in tasks]
+
+
+def _run_check(check, *args):
+    """Run one async check on its own client (pytest entry point; main shares one client)."""
+    async def _run():
+        async with make_client() as client:
+            return await check(client, *args)
+    return asyncio.run(_run())
+
+
+@pytest.mark.skipif(not RUN_INTEGRATION, reason="Set RUN_INTEGRATION_TESTS=true to run")
+@pytest.mark.parametrize("tc", TEST_CASES, ids=lambda t: t["name"])
+def test_archetype(tc):
+    """Each scam archetype should be detected by the live API."""
+    result = _run_check(run_test, tc)
+    assert result["status"] == "PASS", result.get("error", result)
+
+
+@pytest.mark.skipif(not RUN_INTEGRATION, reason="Set RUN_INTEGRATION_TESTS=true to run")
+def test_persona_consistency():
+    """Test that personas are consistent across multiple messages."""
+    result = _run_check(check_persona_consistency)
+    assert result["status"] != "FAIL", result
+
+
+@pytest.mark.skipif(not RUN_INTEGRATION, reason="Set RUN_INTEGRATION_TESTS=true to run")
+def test_latency():
+    """Test API responds within 1 second."""
+    result = _run_check(check_latency)
+    assert result["status"] == "PASS", result
+
+
 def main():
+    return asyncio.run(_main())
+
+
+async def _main():
     print("=" * 60)
     print("🎯 Operation Iron-Mask: Comprehensive Test Suite")
     print("=" * 60)
@@ -218,33 +325,25 @@ def main():
     print("📋 Testing 12 Scam Archetypes...")
     print("-" * 60)
     
-    results = []
-    passed = 0
-    
-    for test_case in TEST_CASES:
-        print(f"  Testing: {test_case['name']}...", end=" ", flush=True)
-        result = run_test(test_case)
-        results.append(result)
+    async with make_client() as client:
+        results = await run_all_tests(client)
+        failed = [r["name"] for r in results if r.get("status") != "PASS"]
         
-        if result.get("status") == "PASS":
-            passed += 1
-            print(f"✅ ({result.get('latency_ms', 0)}ms)")
-        else:
-            print(f"❌ {result.get('error', '')}")
-    
-    print()
-    print(f"Archetype Tests: {passed}/{len(TEST_CASES)} passed")
-    print()
-    
-    # Persona consistency test
-    print("🎭 Testing Persona Consistency...", end=" ", flush=True)
-    persona_result = test_persona_consistency()
-    print("✅")
-    
-    # Latency test
-    print("⏱️ Testing Latency...", end=" ", flush=True)
-    latency_result = test_latency()
-    print(f"✅ ({latency_result.get('latency_seconds', 0)}s)")
+        print()
+        print(f"Archetype Tests: {len(TEST_CASES) - len(failed)}/{len(TEST_CASES)} passed")
+        if failed:
+            print(f"❌ Failed: {', '.join(failed)}")
+        print()
+        
+        # Persona consistency test
+        print("🎭 Testing Persona Consistency...", end=" ")
+        persona_result = await check_persona_consistency(client)
+        print("✅" if persona_result["status"] != "FAIL" else "❌")
+        
+        # Latency test
+        print("⏱️ Testing Latency...", end=" ")
+        latency_result = await check_latency(client)
+        print(f"✅ ({latency_result.get('latency_seconds', 0)}s)")
     
     print()
     print("=" * 60)
@@ -279,9 +378,10 @@ def main():
     
     print()
     print("=" * 60)
-    print("✅ Test Suite Completed!")
+    print("✅ Test Suite Completed!" if not failed else f"❌ Test Suite Completed with {len(failed)} failed case(s)")
     print("=" * 60)
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
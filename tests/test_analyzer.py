@@ -1,9 +1,7 @@
 """
 Quick test for the conversation analyzer module
 """
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _path_setup  # noqa: F401  (puts the project root on sys.path)
 
 from core.conversation_analyzer import detect_intents, ScammerIntent, analyze_conversation, CONTEXTUAL_RESPONSES
 
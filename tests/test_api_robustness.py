@@ -3,42 +3,58 @@ API Robustness and Real-World Behavior Tests
 Validates request validation, history handling, callback triggering, and core endpoint behavior.
 """
 
+import threading
+
 import pytest
 
 import app as app_module
 
+_REAL_RUN_ASYNC = app_module.run_async  # Captured before the module stubs replace it
+
+
+@pytest.fixture(scope="module")
+def _stub_integrations():
+    """Stub DB, cache, WhatsApp and LLM integrations once for every test in this module."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(app_module.app, "testing", True)
+        mp.setattr(app_module, "API_KEY_SECRET", "test_key")
+
+        mp.setattr(app_module, "run_async", lambda func, *args, **kwargs: func(*args, **kwargs))
+        mp.setattr(app_module, "whatsapp_configured", False)
+
+        mp.setattr(app_module, "get_persona", lambda session_id: None)
+        mp.setattr(app_module, "get_cached_persona", lambda session_id: None)
+        mp.setattr(app_module, "save_persona", lambda *args, **kwargs: None)
+        mp.setattr(app_module, "cache_persona", lambda *args, **kwargs: None)
+        mp.setattr(app_module, "queue_message", lambda *args, **kwargs: None)
+        mp.setattr(app_module, "update_session_activity", lambda *args, **kwargs: None)
+        mp.setattr(app_module, "save_intelligence", lambda *args, **kwargs: None)
+        mp.setattr(app_module, "mark_callback_sent", lambda *args, **kwargs: None)
+        mp.setattr(app_module, "get_callback_sent", lambda *args, **kwargs: False)
+
+        def fake_generate_agent_response(**kwargs):
+            return {
+                "intelligence": {},
+                "scam_detected": False,
+                "agent_notes": "test",
+                "strategy": "stalling",
+                "response": "Haan ji, ek minute."
+            }
+
+        mp.setattr(app_module, "generate_agent_response", fake_generate_agent_response)
+        yield
+
+
+@pytest.fixture(scope="module")
+def client(_stub_integrations):
+    """Provide one Flask test client per module with external integrations stubbed out."""
+    return app_module.app.test_client()
 
-@pytest.fixture
-def client(monkeypatch):
-    """Provide a Flask test client with external integrations stubbed out."""
-    app_module.app.testing = True
-    app_module.API_KEY_SECRET = "test_key"
-    app_module.SENT_CALLBACKS.clear()
 
-    monkeypatch.setattr(app_module, "run_async", lambda func, *args, **kwargs: func(*args, **kwargs))
-    monkeypatch.setattr(app_module, "whatsapp_configured", False)
-
-    monkeypatch.setattr(app_module, "get_persona", lambda session_id: None)
-    monkeypatch.setattr(app_module, "get_cached_persona", lambda session_id: None)
-    monkeypatch.setattr(app_module, "save_persona", lambda *args, **kwargs: None)
-    monkeypatch.setattr(app_module, "cache_persona", lambda *args, **kwargs: None)
-    monkeypatch.setattr(app_module, "save_message", lambda *args, **kwargs: None)
-    monkeypatch.setattr(app_module, "update_session_activity", lambda *args, **kwargs: None)
-    monkeypatch.setattr(app_module, "save_intelligence", lambda *args, **kwargs: None)
-    monkeypatch.setattr(app_module, "mark_callback_sent", lambda *args, **kwargs: None)
-    monkeypatch.setattr(app_module, "get_callback_sent", lambda *args, **kwargs: False)
-
-    def fake_generate_agent_response(**kwargs):
-        return {
-            "intelligence": {},
-            "scam_detected": False,
-            "agent_notes": "test",
-            "strategy": "stalling",
-            "response": "Haan ji, ek minute."
-        }
-
-    monkeypatch.setattr(app_module, "generate_agent_response", fake_generate_agent_response)
-    return app_module.app.test_client()
+@pytest.fixture(autouse=True)
+def _reset_sent_callbacks():
+    """Each test starts with no callbacks recorded."""
+    app_module.SENT_CALLBACKS.clear()
 
 
 @pytest.fixture
@@ -112,10 +128,14 @@ def test_history_intelligence_merges_across_turns(client, headers):
 def test_callback_triggers_on_actionable_intel(client, headers, monkeypatch):
     """Reality check: GUVI callback triggers when actionable intel is detected."""
     calls = []
+    delivered = threading.Event()
 
     def fake_callback(payload):
         calls.append(payload)
+        delivered.set()
 
+    # Use the real threaded dispatcher here so DB writes run off the request thread
+    monkeypatch.setattr(app_module, "run_async", _REAL_RUN_ASYNC)
     monkeypatch.setattr(app_module, "send_callback_async", fake_callback)
 
     payload = {
@@ -125,6 +145,7 @@ def test_callback_triggers_on_actionable_intel(client, headers, monkeypatch):
     }
     response = client.post("/api/honey-pot", headers=headers, json=payload)
     assert response.status_code == 200
+    assert delivered.wait(1.0)
     assert len(calls) == 1
     assert calls[0]["sessionId"] == "callback-1"
 
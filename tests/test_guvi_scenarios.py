@@ -17,18 +17,49 @@ Usage:
     # Remote Render deployment:
     set TEST_API_URL=https://guvi-project-1-wefr.onrender.com/api/honey-pot
     python tests/test_guvi_scenarios.py
+
+    # Optional pause between turns (seconds, default 0; 429 Retry-After is always honored):
+    set TEST_TURN_DELAY=0.5
+
+    # Re-judge the last recorded run (tests/.cache/guvi/) without calling the API:
+    python tests/test_guvi_scenarios.py --offline
 """
 
-import requests
+import asyncio
+import httpx
 import json
 import time
 import sys
 import os
+import io
+import hashlib
+import tempfile
+from collections import defaultdict
+from types import MappingProxyType
+
+try:
+    import orjson  # Optional: faster payload encoding/decoding for the test client
+except ImportError:
+    orjson = None
 
 # ─── Configuration ──────────────────────────────────────────────────
 API_URL = os.getenv("TEST_API_URL", "http://127.0.0.1:5000/api/honey-pot")
 API_KEY = "sk_ironmask_hackathon_2026"
+# Pause between turns (seconds); the server answers synchronously, so none by default
+TURN_DELAY = float(os.getenv("TEST_TURN_DELAY", "0"))
 HEADERS = {"x-api-key": API_KEY, "Content-Type": "application/json"}
+# Live runs record every turn here; --offline (or GUVI_OFFLINE=1) replays them
+RECORD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "guvi")
+OFFLINE = "--offline" in sys.argv or bool(os.getenv("GUVI_OFFLINE"))
+# Report only the first format issue per turn (CI smoke runs only need pass/fail)
+FAST_FAIL = bool(os.getenv("GUVI_FAST_FAIL"))
+
+# A healthy check is remembered across runs for this long (per target URL)
+HEALTH_CACHE = os.path.join(tempfile.gettempdir(), "guvi_health.json")
+HEALTH_TTL = 30
+
+# Shared by all scenarios' client; concurrent turns reuse pooled keep-alive connections
+CLIENT_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=8)
 
 # Colors
 G = "\033[92m"; R = "\033[91m"; Y = "\033[93m"; C = "\033[96m"
@@ -131,11 +162,77 @@ GUVI_SCENARIOS = [
     }
 ]
 
+# Scenarios run concurrently and share these definitions; make them read-only
+GUVI_SCENARIOS = tuple(
+    MappingProxyType({
+        **s,
+        "scammerTurns": tuple(s["scammerTurns"]),
+        "expectedExtraction": MappingProxyType(s["expectedExtraction"]),
+    })
+    for s in GUVI_SCENARIOS
+)
+
 
 # ─── Helpers ────────────────────────────────────────────────────────
 
-def send_message(session_id, message, history, metadata=None):
-    """Send a message to the honeypot API."""
+def encode_body(payload) -> bytes:
+    """Serialize a request body once, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def decode_body(content: bytes):
+    """Parse a response body, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class ScenarioTape:
+    """Recorded (request key, response) turns of one scenario, stored as JSONL."""
+
+    def __init__(self, scenario_id):
+        self.path = os.path.join(RECORD_DIR, f"{scenario_id}.jsonl")
+        self.entries = []
+
+    @staticmethod
+    def request_key(payload):
+        """Hash of the request without its per-run sessionId, to check replays stay aligned."""
+        body = {k: v for k, v in payload.items() if k != "sessionId"}
+        return hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()[:16]
+
+    def record(self, payload, response):
+        self.entries.append({"key": self.request_key(payload), "request": payload, "response": response})
+
+    def save(self):
+        os.makedirs(RECORD_DIR, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in self.entries)
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = [json.loads(line) for line in f if line.strip()]
+        except OSError:
+            self.entries = []
+        return self
+
+    def replay(self, payload):
+        """Next recorded response, or an error dict if the tape ran out or diverged."""
+        if not self.entries:
+            return {"error": f"no recorded turn left in {self.path}"}
+        entry = self.entries.pop(0)
+        if entry["key"] != self.request_key(payload):
+            return {"error": f"request differs from the recording in {self.path}"}
+        return entry["response"]
+
+
+async def send_message(client, session_id, message, history, metadata=None, tape=None):
+    """Send a message to the honeypot API. Returns (parsed JSON, response or None).
+
+    With a tape, live responses are recorded to it; offline, they are replayed from it.
+    """
     payload = {
         "sessionId": session_id,
         "message": {"text": message},
@@ -143,70 +240,115 @@ def send_message(session_id, message, history, metadata=None):
     }
     if metadata:
         payload["metadata"] = metadata
+    if OFFLINE and tape is not None:
+        return tape.replay(payload), None
     try:
-        resp = requests.post(API_URL, headers=HEADERS, json=payload, timeout=30)
-        return resp.json()
-    except requests.exceptions.ConnectionError:
-        print(f"\n{R}❌ Cannot connect to {API_URL}")
-        print(f"   Start the server first: python app.py{X}\n")
-        sys.exit(1)
+        # Content-Type comes from the client's HEADERS
+        resp = await client.post(API_URL, content=encode_body(payload))
+    except httpx.ConnectError:
+        raise  # fatal for the whole run; main() reports it once
     except Exception as e:
-        return {"error": str(e)}
-
-
-def validate_format(response):
-    """Validate GUVI-required response format."""
+        return {"error": str(e)}, None
+    try:
+        data = decode_body(resp.content)
+    except ValueError as e:
+        data = {"error": f"HTTP {resp.status_code}: {e}"}
+    if tape is not None:
+        tape.record(payload, data)
+    return data, resp
+
+
+def turn_delay(resp):
+    """Seconds to wait before the next turn: TURN_DELAY, or longer if the server sent 429."""
+    delay = TURN_DELAY
+    if resp is not None and resp.status_code == 429:
+        try:
+            retry_after = float(resp.headers.get("Retry-After", 1))
+        except ValueError:  # HTTP-date form
+            retry_after = 1.0
+        delay = max(delay, retry_after)
+    return delay
+
+
+# GUVI-required response shape: (top-level field, type), then required nested fields
+_FORMAT_SPEC = (
+    ("status", str), ("scamDetected", bool), ("engagementMetrics", dict),
+    ("extractedIntelligence", dict), ("agentNotes", str), ("reply", str),
+)
+_METRIC_FIELDS = ("engagementDurationSeconds", "totalMessagesExchanged")
+_INTEL_FIELDS = ("bankAccounts", "upiIds", "phishingLinks", "phoneNumbers",
+                 "suspiciousKeywords", "emails", "ifscCodes")
+
+
+def validate_format(response, fast_fail=False):
+    """Validate GUVI-required response format.
+
+    With fast_fail, stop at the first issue (pass/fail smoke runs don't need the full list).
+    """
     issues = []
-    for field, typ in {"status": str, "scamDetected": bool, "engagementMetrics": dict,
-                       "extractedIntelligence": dict, "agentNotes": str, "reply": str}.items():
+    for field, typ in _FORMAT_SPEC:
         if field not in response:
             issues.append(f"Missing '{field}'")
         elif not isinstance(response[field], typ):
             issues.append(f"'{field}' wrong type: {type(response[field]).__name__}")
+        if fast_fail and issues:
+            return issues
 
     metrics = response.get("engagementMetrics", {})
-    for mf in ["engagementDurationSeconds", "totalMessagesExchanged"]:
+    for mf in _METRIC_FIELDS:
         if mf not in metrics:
             issues.append(f"Missing engagementMetrics.{mf}")
+            if fast_fail:
+                return issues
 
     intel = response.get("extractedIntelligence", {})
-    for field in ["bankAccounts", "upiIds", "phishingLinks", "phoneNumbers",
-                   "suspiciousKeywords", "emails", "ifscCodes"]:
+    for field in _INTEL_FIELDS:
         if field not in intel:
             issues.append(f"Missing extractedIntelligence.{field}")
         elif not isinstance(intel[field], list):
             issues.append(f"extractedIntelligence.{field} not a list")
+        if fast_fail and issues:
+            return issues
 
     if not response.get("reply", "").strip():
         issues.append("Reply is empty")
     return issues
 
 
+_PHONE_STRIP = str.maketrans("", "", "- ")
+
+
+def _strip_phone(number):
+    """Drop dashes and spaces so '+91-98765 43210' and '+919876543210' compare equal."""
+    return number.translate(_PHONE_STRIP)
+
+
 def check_extraction(final_intel, expected, scenario_name):
     """Check if expected intelligence items were extracted."""
     issues = []
 
     for key in ["phoneNumbers", "bankAccounts", "upiIds", "phishingLinks", "emails", "emailAddresses"]:
         expected_items = expected.get(key, [])
-        actual_items = [x.lower() for x in final_intel.get(key, [])]
+        actual_items = {x.lower() for x in final_intel.get(key, [])}
+        # Phones compare without separators; normalize the actual side once per key
+        is_phone = key == "phoneNumbers"
+        if is_phone:
+            actual_cmp = {_strip_phone(a) for a in actual_items}
+        else:
+            actual_cmp = actual_items
 
         for item in expected_items:
-            item_lower = item.lower()
-            # Normalize phone for comparison
-            if key == "phoneNumbers":
-                item_clean = item_lower.replace("-", "").replace(" ", "")
-                actual_clean = [a.replace("-", "").replace(" ", "") for a in actual_items]
-                if item_clean not in actual_clean:
-                    issues.append(f"Missing {key}: {item} (got: {final_intel.get(key, [])})")
-            elif item_lower not in actual_items:
+            cmp_item = _strip_phone(item.lower()) if is_phone else item.lower()
+            if cmp_item not in actual_cmp:
                 issues.append(f"Missing {key}: {item} (got: {final_intel.get(key, [])})")
 
     # Check mentioned banks
     if "mentionedBanks" in expected:
-        actual_banks = [b.lower() for b in final_intel.get("mentionedBanks", [])]
+        banks = final_intel.get("mentionedBanks", [])
+        actual_banks = {b.lower() for b in banks}
         for bank in expected["mentionedBanks"]:
             if bank.lower() not in actual_banks:
-                issues.append(f"Missing mentionedBank: {bank} (got: {actual_banks})")
+                issues.append(f"Missing mentionedBank: {bank} (got: {[b.lower() for b in banks]})")
 
     # Check minimum keywords
     min_kw = expected.get("minKeywords", 0)
@@ -217,15 +359,19 @@ def check_extraction(final_intel, expected, scenario_name):
     return issues
 
 
-def print_turn(n, sender, msg):
+def write_lines(lines, out=None):
+    """Emit a multi-line block with one write instead of a print() per line."""
+    (out or sys.stdout).write("\n".join(lines) + "\n")
+
+
+def print_turn(n, sender, msg, out=None):
     color = R if sender == "SCAMMER" else G
     icon = "🔴" if sender == "SCAMMER" else "🟢"
     display = msg[:130] + "..." if len(msg) > 130 else msg
-    print(f"\n  {color}{B}[Turn {n}] {icon} {sender}:{X}")
-    print(f"  {D}{display}{X}")
+    write_lines([f"\n  {color}{B}[Turn {n}] {icon} {sender}:{X}", f"  {D}{display}{X}"], out)
 
 
-def print_intel(intel):
+def print_intel(intel, out=None):
     """Compact intel summary."""
     items = []
     for key, label in [("upiIds", "UPI"), ("bankAccounts", "Bank"), ("phoneNumbers", "Phone"),
@@ -238,60 +384,51 @@ def print_intel(intel):
     if kws:
         items.append(f"Keywords({len(kws)}): {kws[:6]}")
     if items:
-        print(f"  {Y}📊 {', '.join(items)}{X}")
+        print(f"  {Y}📊 {', '.join(items)}{X}", file=out)
     else:
-        print(f"  {D}📊 Intel: (none){X}")
+        print(f"  {D}📊 Intel: (none){X}", file=out)
 
 
 # ─── Pre-flight: Regex Unit Validation ──────────────────────────────
 
+# Set once the preflight passes, so repeat calls in the same process are free
+_PREFLIGHT_PASSED = False
+
+
 def run_regex_preflight():
     """Test extraction functions directly against fakeData items."""
+    global _PREFLIGHT_PASSED
+    if _PREFLIGHT_PASSED:
+        return True
+
     print(f"\n{B}{M}{'='*70}")
     print(f"  🔬 PRE-FLIGHT: Regex Extraction Validation")
     print(f"{'='*70}{X}\n")
 
     try:
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-        from models.intelligence import (
-            extract_upi_ids, extract_bank_accounts, extract_phone_numbers,
-            extract_urls, extract_emails, extract_keywords, extract_mentioned_banks
-        )
+        from test_regex_preflight import PREFLIGHT_CASES as tests
     except ImportError:
         print(f"  {Y}⚠ Cannot import intelligence module — skipping preflight{X}")
         return True
 
-    tests = [
-        ("bank_fraud: bank account", extract_bank_accounts,
-         "transfer from account 1234567890123456", "1234567890123456"),
-        ("bank_fraud: UPI ID", extract_upi_ids,
-         "send to scammer.fraud@fakebank", "scammer.fraud@fakebank"),
-        ("bank_fraud: phone", extract_phone_numbers,
-         "call me at +91-9876543210", "+919876543210"),
-        ("bank_fraud: mentioned bank", extract_mentioned_banks,
-         "Your SBI account has been compromised", "sbi"),
-        ("upi_fraud: UPI ID", extract_upi_ids,
-         "pay to cashback.scam@fakeupi", "cashback.scam@fakeupi"),
-        ("upi_fraud: phone", extract_phone_numbers,
-         "contact at +91-8765432109", "+918765432109"),
-        ("upi_fraud: mentioned bank", extract_mentioned_banks,
-         "cashback from Paytm", "paytm"),
-        ("phishing: URL", extract_urls,
-         "click http://amaz0n-deals.fake-site.com/claim?id=12345", "http://amaz0n-deals.fake-site.com/claim?id=12345"),
-        ("phishing: email", extract_emails,
-         "email us at offers@fake-amazon-deals.com", "offers@fake-amazon-deals.com"),
-        ("keywords: urgent", extract_keywords,
-         "URGENT: Your account has been compromised", "urgent"),
-        ("keywords: cashback", extract_keywords,
-         "You have won a cashback of Rs. 5000", "cashback"),
-    ]
+    # One extractor call per function over all of its samples, joined by a separator
+    # line. A hit here is only a per-group check: a sibling sample yielding the same
+    # token, or a context-window extractor (phones, bank accounts, emails) matching
+    # across the separator, can mask one sample's regression. A miss is re-run on
+    # that sample alone, so failures and their "Got:" output are per-sample.
+    texts_by_func = defaultdict(list)
+    for _, func, text, _ in tests:
+        texts_by_func[func].append(text)
+    group_results = {func: func("\n|||\n".join(texts)) for func, texts in texts_by_func.items()}
+    # Normalize for comparison
+    found = {func: {r.lower() for r in result} for func, result in group_results.items()}
 
     all_passed = True
     for label, func, text, expected in tests:
-        result = func(text)
-        # Normalize for comparison
-        result_lower = [r.lower() for r in result]
-        passed = expected.lower() in result_lower
+        passed = expected.lower() in found[func]
+        if not passed:
+            result = func(text)
+            passed = expected.lower() in {r.lower() for r in result}
         icon = f"{G}✓{X}" if passed else f"{R}✗{X}"
         if not passed:
             all_passed = False
@@ -301,6 +438,7 @@ def run_regex_preflight():
             print(f"  {icon} {label}: {expected}")
 
     print()
+    _PREFLIGHT_PASSED = all_passed
     if all_passed:
         print(f"  {G}{B}✅ All regex tests passed!{X}")
     else:
@@ -311,17 +449,23 @@ def run_regex_preflight():
 
 # ─── Main Scenario Runner ──────────────────────────────────────────
 
-def run_scenario(scenario):
+async def run_scenario(client, scenario):
     """Run a GUVI evaluation scenario with multi-turn conversation."""
     sid = f"guvi_eval_{scenario['scenarioId']}_{int(time.time())}"
     name = scenario["name"]
     scam_type = scenario["scamType"]
     expected = scenario["expectedExtraction"]
-
-    print(f"\n{'='*70}")
-    print(f"{B}{C}  🎯 [{scam_type.upper()}] {name}{X}")
-    print(f"  {D}Channel: {scenario['metadata']['channel']} | Max Turns: {scenario['maxTurns']} | Weight: {scenario['weight']}{X}")
-    print(f"{'='*70}")
+    out = io.StringIO()
+    tape = ScenarioTape(scenario["scenarioId"])
+    if OFFLINE:
+        tape.load()
+
+    write_lines([
+        f"\n{'='*70}",
+        f"{B}{C}  🎯 [{scam_type.upper()}] {name}{X}",
+        f"  {D}Channel: {scenario['metadata']['channel']} | Max Turns: {scenario['maxTurns']} | Weight: {scenario['weight']}{X}",
+        f"{'='*70}",
+    ], out)
 
     result = {
         "name": name,
@@ -335,34 +479,38 @@ def run_scenario(scenario):
 
     history = []
     start = time.time()
+    delay = 0
 
     for i, msg in enumerate(scenario["scammerTurns"]):
         turn_num = i + 1
-        print_turn(turn_num, "SCAMMER", msg)
+        if delay:
+            await asyncio.sleep(delay)
+        print_turn(turn_num, "SCAMMER", msg, out)
 
-        resp = send_message(sid, msg, history, scenario.get("metadata"))
+        resp, http_resp = await send_message(client, sid, msg, history, scenario.get("metadata"), tape)
+        delay = turn_delay(http_resp)
         if "error" in resp and "status" not in resp:
             result["issues"].append(f"Turn {turn_num}: API error - {resp['error']}")
             result["passed"] = False
             continue
 
         # Validate format
-        fmt_issues = validate_format(resp)
+        fmt_issues = validate_format(resp, fast_fail=FAST_FAIL)
         if fmt_issues:
             for issue in fmt_issues:
                 result["issues"].append(f"Turn {turn_num}: {issue}")
             result["passed"] = False
 
         reply = resp.get("reply", "(no reply)")
-        print_turn(turn_num, "HONEYPOT", reply)
+        print_turn(turn_num, "HONEYPOT", reply, out)
 
         intel = resp.get("extractedIntelligence", {})
-        print_intel(intel)
+        print_intel(intel, out)
 
         scam = resp.get("scamDetected", False)
         label = f"{G}✓ Scam Detected{X}" if scam else f"{D}○ No scam{X}"
         msgs = resp.get("engagementMetrics", {}).get("totalMessagesExchanged", "?")
-        print(f"  {label} | Messages: {msgs}")
+        print(f"  {label} | Messages: {msgs}", file=out)
 
         history.append({"sender": "scammer", "text": msg})
         history.append({"sender": "agent", "text": reply})
@@ -372,9 +520,9 @@ def run_scenario(scenario):
             "scamDetected": scam, "intel": intel,
         })
 
-        time.sleep(0.5)
-
     elapsed = time.time() - start
+    if not OFFLINE:
+        tape.save()
     result["total_time"] = round(elapsed, 1)
 
     # Post-conversation validation
@@ -395,7 +543,7 @@ def run_scenario(scenario):
 
         # 3. Reply variety
         replies = [t["reply"] for t in result["turns"]]
-        if len(replies) >= 3 and len(set(replies)) < 2:
+        if len(replies) >= 3 and all(r == replies[0] for r in replies[1:]):
             result["issues"].append("All replies identical — no variety")
             result["passed"] = False
 
@@ -405,24 +553,53 @@ def run_scenario(scenario):
             result["warnings"].append(f"{len(short)} replies too short (<20 chars)")
 
     # Summary
-    print(f"\n  {'─'*50}")
+    lines = [f"\n  {'─'*50}"]
     if result["passed"]:
-        print(f"  {G}{B}✅ SCENARIO PASSED{X} ({result['total_time']}s)")
+        lines.append(f"  {G}{B}✅ SCENARIO PASSED{X} ({result['total_time']}s)")
     else:
-        print(f"  {R}{B}❌ SCENARIO FAILED{X} ({result['total_time']}s)")
-        for issue in result["issues"]:
-            print(f"  {R}  ⚠ {issue}{X}")
-    for w in result.get("warnings", []):
-        print(f"  {Y}  ⚠ {w}{X}")
-
+        lines.append(f"  {R}{B}❌ SCENARIO FAILED{X} ({result['total_time']}s)")
+        lines.extend(f"  {R}  ⚠ {issue}{X}" for issue in result["issues"])
+    lines.extend(f"  {Y}  ⚠ {w}{X}" for w in result.get("warnings", []))
+    write_lines(lines, out)
+
+    # Scenarios interleave on the event loop; flush this one's output as a single block
+    sys.stdout.write(out.getvalue())
+    sys.stdout.flush()
     return result
 
 
+async def run_all_scenarios():
+    """Run every scenario concurrently on one event loop; results keep GUVI_SCENARIOS order."""
+    async with httpx.AsyncClient(headers=HEADERS, timeout=30.0, limits=CLIENT_LIMITS) as client:
+        return await asyncio.gather(*(run_scenario(client, s) for s in GUVI_SCENARIOS))
+
+
+def check_health():
+    """Return the /health status code, reusing a recent 200 for the same API_URL."""
+    try:
+        with open(HEALTH_CACHE, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached["url"] == API_URL and time.time() - cached["ts"] < HEALTH_TTL:
+            return 200
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # no usable cache entry
+
+    health_url = API_URL.replace("/api/honey-pot", "/health")
+    status = httpx.get(health_url, timeout=10).status_code
+    if status == 200:
+        try:
+            with open(HEALTH_CACHE, "w", encoding="utf-8") as f:
+                json.dump({"url": API_URL, "ts": time.time()}, f)
+        except OSError:
+            pass
+    return status
+
+
 def main():
     print(f"\n{B}{C}{'='*70}")
     print(f"  🎯 GUVI EVALUATION SCENARIO TEST SUITE")
     print(f"  Exact scenarios from GUVI automated evaluation")
-    print(f"  Target: {API_URL}")
+    print(f"  Target: {'recorded responses (' + RECORD_DIR + ')' if OFFLINE else API_URL}")
     print(f"{'='*70}{X}")
 
     # Phase 1: Regex pre-flight
@@ -430,27 +607,28 @@ def main():
     if not regex_ok:
         print(f"{Y}⚠ Regex issues detected — API tests may also fail{X}")
 
-    # Phase 2: Health check
+    # Phase 2: Health check (nothing to reach when replaying)
     print(f"\n{B}🏥 Health Check...{X}")
     try:
-        health_url = API_URL.replace("/api/honey-pot", "/health")
-        health = requests.get(health_url, timeout=10)
-        if health.status_code == 200:
+        status = 200 if OFFLINE else check_health()
+        if status == 200:
             print(f"  {G}✓ Server is healthy{X}\n")
         else:
-            print(f"  {Y}⚠ Health returned {health.status_code}{X}\n")
+            print(f"  {Y}⚠ Health returned {status}{X}\n")
     except Exception:
         print(f"  {R}❌ Cannot reach server at {API_URL}")
         print(f"  Start with: python app.py{X}\n")
         sys.exit(1)
 
-    # Phase 3: Run all 3 GUVI scenarios
-    all_results = []
+    # Phase 3: Run all 3 GUVI scenarios (independent sessions, so concurrently)
     total_start = time.time()
 
-    for scenario in GUVI_SCENARIOS:
-        result = run_scenario(scenario)
-        all_results.append(result)
+    try:
+        all_results = asyncio.run(run_all_scenarios())
+    except httpx.ConnectError:
+        print(f"\n{R}❌ Cannot connect to {API_URL}")
+        print(f"   Start the server first: python app.py{X}\n")
+        sys.exit(1)
 
     total_time = round(time.time() - total_start, 1)
 
@@ -459,34 +637,34 @@ def main():
     failed = sum(1 for r in all_results if not r["passed"])
     total = len(all_results)
 
-    print(f"\n\n{'='*70}")
-    print(f"{B}{C}  📋 GUVI EVALUATION RESULTS{X}")
-    print(f"{'='*70}")
-    print(f"  Total scenarios: {total}")
-    print(f"  {G}Passed: {passed}{X}")
+    # The whole summary is built up and written once at the end
+    lines = [
+        f"\n\n{'='*70}",
+        f"{B}{C}  📋 GUVI EVALUATION RESULTS{X}",
+        f"{'='*70}",
+        f"  Total scenarios: {total}",
+        f"  {G}Passed: {passed}{X}",
+    ]
     if failed:
-        print(f"  {R}Failed: {failed}{X}")
-    print(f"  Total time: {total_time}s")
-    print()
+        lines.append(f"  {R}Failed: {failed}{X}")
+    lines += [f"  Total time: {total_time}s", ""]
 
     for r in all_results:
         status = f"{G}✅ PASS{X}" if r["passed"] else f"{R}❌ FAIL{X}"
         turns = len(r["turns"])
-        print(f"  {status}  [{r['scenarioId']}] {r['name']} ({turns} turns, {r['total_time']}s)")
+        lines.append(f"  {status}  [{r['scenarioId']}] {r['name']} ({turns} turns, {r['total_time']}s)")
         if not r["passed"]:
-            for issue in r["issues"][:5]:
-                print(f"        {R}⚠ {issue}{X}")
+            lines.extend(f"        {R}⚠ {issue}{X}" for issue in r["issues"][:5])
 
     # Weighted score
     total_weight = sum(s["weight"] for s in GUVI_SCENARIOS)
     earned_weight = sum(
         s["weight"] for s, r in zip(GUVI_SCENARIOS, all_results) if r["passed"]
     )
-    print(f"\n  {B}Weighted Score: {earned_weight}/{total_weight} ({earned_weight/total_weight*100:.0f}%){X}")
+    lines.append(f"\n  {B}Weighted Score: {earned_weight}/{total_weight} ({earned_weight/total_weight*100:.0f}%){X}")
 
     # Intelligence extraction summary
-    print(f"\n{B}{M}  🧠 INTELLIGENCE EXTRACTION SUMMARY{X}")
-    print(f"{'─'*70}")
+    lines += [f"\n{B}{M}  🧠 INTELLIGENCE EXTRACTION SUMMARY{X}", f"{'─'*70}"]
     all_intel = {}
     for key in ["upiIds", "bankAccounts", "phoneNumbers", "phishingLinks",
                  "emails", "ifscCodes", "mentionedBanks", "suspiciousKeywords"]:
@@ -498,12 +676,13 @@ def main():
                 all_intel[key].extend(intel.get(key, []))
 
     for key, vals in all_intel.items():
-        unique = list(set(vals))
+        unique = list(dict.fromkeys(vals))  # insertion order keeps the log reproducible
         icon = f"{G}✓{X}" if unique else f"{D}○{X}"
         sample = str(unique[:3])[:60] if unique else "-"
-        print(f"  {icon} {key:22s}: {len(unique):3d} unique | {sample}")
+        lines.append(f"  {icon} {key:22s}: {len(unique):3d} unique | {sample}")
 
-    print(f"{'─'*70}\n")
+    lines.append(f"{'─'*70}\n")
+    write_lines(lines)
 
     sys.exit(0 if failed == 0 else 1)
 
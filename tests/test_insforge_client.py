@@ -1,16 +1,51 @@
+import json
+import types
+
+import pytest
+
 from utils import insforge_client
 
 
 class FakeResponse:
-    def __init__(self, status_code, data=None, text=""):
+    def __init__(self, status_code, data=None, text="", headers=None):
         self.status_code = status_code
         self._data = data or []
         self.text = text
+        self.headers = headers or {}
 
     def json(self):
         return self._data
 
 
+# Canned responses; FakeResponse is never mutated, so tests can share them
+_OK_201 = FakeResponse(201)
+_OK_200 = FakeResponse(200)
+
+
+def _unexpected(method):
+    def fail(*args, **kwargs):
+        raise AssertionError(f"unexpected InsForge {method} call")
+    return fail
+
+
+@pytest.fixture
+def insforge_mocked(monkeypatch):
+    """Configure REST_URL and route the client's post/get/patch to per-test fakes.
+
+    Tests assign only the fakes they need (mocks.post = ...); any other call fails.
+    """
+    monkeypatch.setattr(insforge_client, "REST_URL", "https://example.insforge.app/api/database/records")
+    monkeypatch.setattr(insforge_client, "_persona_cache", insforge_client.OrderedDict())
+    monkeypatch.setattr(insforge_client, "_callback_sent_cache", insforge_client.OrderedDict())
+    mocks = types.SimpleNamespace(**{m: _unexpected(m) for m in ("post", "get", "patch")})
+    for method in ("post", "get", "patch"):
+        monkeypatch.setattr(
+            insforge_client._CLIENT, method,
+            lambda *args, _method=method, **kwargs: getattr(mocks, _method)(*args, **kwargs),
+        )
+    return mocks
+
+
 def test_get_headers_includes_auth_key(monkeypatch):
     monkeypatch.setattr(insforge_client, "INSFORGE_KEY", "test_key")
     headers = insforge_client.get_headers()
@@ -22,62 +57,169 @@ def test_get_persona_returns_none_when_not_configured(monkeypatch):
     assert insforge_client.get_persona("s1") is None
 
 
-def test_save_persona_success(monkeypatch):
-    monkeypatch.setattr(insforge_client, "REST_URL", "https://example.insforge.app/api/database/records")
+def test_save_persona_success(insforge_mocked):
+    calls = []
 
-    def fake_post(url, headers, json, timeout):
-        return FakeResponse(201)
+    def fake_post(url, headers, content, timeout):
+        calls.append((url, headers["Prefer"]))
+        return _OK_201
 
-    monkeypatch.setattr(insforge_client.httpx, "post", fake_post)
+    insforge_mocked.post = fake_post
     saved = insforge_client.save_persona("s1", {"name": "Asha", "bank": {"name": "SBI"}, "upi": {"primary": "a@upi"}})
     assert saved is True
+    assert calls == [(
+        "https://example.insforge.app/api/database/records/personas?on_conflict=session_id",
+        "return=minimal,resolution=ignore-duplicates",
+    )]
 
 
-def test_save_intelligence_updates_existing(monkeypatch):
-    monkeypatch.setattr(insforge_client, "REST_URL", "https://example.insforge.app/api/database/records")
+def test_save_intelligence_upserts_in_one_request(insforge_mocked):
+    calls = []
 
-    def fake_get(url, headers, timeout):
-        return FakeResponse(200, [{"id": 10}])
-
-    def fake_patch(url, headers, json, timeout):
-        return FakeResponse(204)
+    def fake_post(url, headers, content, timeout):
+        calls.append((url, headers["Prefer"]))
+        return _OK_201
 
-    monkeypatch.setattr(insforge_client.httpx, "get", fake_get)
-    monkeypatch.setattr(insforge_client.httpx, "patch", fake_patch)
-    ok = insforge_client.save_intelligence("s1", {"upi_ids": ["a@upi"]}, agent_notes="test")
+    insforge_mocked.post = fake_post
+    ok = insforge_client.save_intelligence("s2", {"bank_accounts": ["1234567890"]}, agent_notes="test")
     assert ok is True
+    assert calls == [(
+        "https://example.insforge.app/api/database/records/intelligence?on_conflict=session_id",
+        "return=minimal,resolution=merge-duplicates",
+    )]
 
 
-def test_save_intelligence_inserts_new(monkeypatch):
-    monkeypatch.setattr(insforge_client, "REST_URL", "https://example.insforge.app/api/database/records")
+def test_get_persona_reuses_recent_fetch(insforge_mocked):
+    fetches = []
 
     def fake_get(url, headers, timeout):
-        return FakeResponse(200, [])
+        fetches.append(url)
+        return FakeResponse(200, [{"persona_json": {"name": "Asha"}}])
 
-    def fake_post(url, headers, json, timeout):
-        return FakeResponse(201)
+    insforge_mocked.get = fake_get
+    assert insforge_client.get_persona("s1") == {"name": "Asha"}
+    assert insforge_client.get_persona("s1") == {"name": "Asha"}
+    assert len(fetches) == 1
 
-    monkeypatch.setattr(insforge_client.httpx, "get", fake_get)
-    monkeypatch.setattr(insforge_client.httpx, "post", fake_post)
-    ok = insforge_client.save_intelligence("s2", {"bank_accounts": ["1234567890"]}, agent_notes="test")
-    assert ok is True
 
+def test_session_filter_is_percent_encoded(insforge_mocked):
+    urls = []
 
-def test_mark_callback_sent(monkeypatch):
-    monkeypatch.setattr(insforge_client, "REST_URL", "https://example.insforge.app/api/database/records")
+    def fake_get(url, headers, timeout):
+        urls.append(url)
+        return _OK_200
+
+    insforge_mocked.get = fake_get
+    insforge_client.get_persona("wa&x=1#frag")
+    assert "personas?session_id=eq.wa%26x%3D1%23frag&select=persona_json" in urls[0]
 
-    def fake_patch(url, headers, json, timeout):
-        return FakeResponse(200)
 
-    monkeypatch.setattr(insforge_client.httpx, "patch", fake_patch)
+def test_callback_sent_is_cached_until_intelligence_is_rewritten(insforge_mocked):
+    insforge_mocked.patch = lambda url, headers, content, timeout: FakeResponse(204)
+    insforge_mocked.post = lambda url, headers, content, timeout: _OK_201
     assert insforge_client.mark_callback_sent("s1") is True
+    # Served from the cache: the default get fake fails on any call
+    assert insforge_client.get_callback_sent("s1") is True
 
+    insforge_client.save_intelligence("s1", {})
+    insforge_mocked.get = lambda url, headers, timeout: FakeResponse(200, [{"callback_sent": False}])
+    assert insforge_client.get_callback_sent("s1") is False
 
-def test_save_message_success(monkeypatch):
-    monkeypatch.setattr(insforge_client, "REST_URL", "https://example.insforge.app/api/database/records")
 
-    def fake_post(url, headers, json, timeout):
-        return FakeResponse(201)
+def test_reads_project_one_column_and_one_row(insforge_mocked):
+    urls = []
+
+    def fake_get(url, headers, timeout):
+        urls.append(url)
+        return _OK_200
+
+    insforge_mocked.get = fake_get
+    insforge_client.get_persona("s1")
+    insforge_client.get_callback_sent("s1")
+    assert urls[0].endswith("&select=persona_json&limit=1")
+    assert "&select=callback_sent&" in urls[1] and urls[1].endswith("&limit=1")
+
+
+def test_transient_errors_are_retried_with_retry_after(insforge_mocked, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(insforge_client.time, "sleep", sleeps.append)
+    replies = iter([FakeResponse(503), FakeResponse(429, headers={"Retry-After": "2"}), _OK_201])
+    insforge_mocked.post = lambda url, headers, content, timeout: next(replies)
+
+    assert insforge_client.save_intelligence("s1", {}) is True
+    assert len(sleeps) == 2 and sleeps[1] == 2.0
+
+
+def test_request_path_reads_give_up_instead_of_waiting_long(insforge_mocked, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(insforge_client.time, "sleep", sleeps.append)
+    calls = []
+
+    def fake_get(url, headers, timeout):
+        calls.append(url)
+        return FakeResponse(429, headers={"Retry-After": "3"})
+
+    insforge_mocked.get = fake_get
+    # A 3s Retry-After exceeds the request-path budget: fail now rather than stall the chat turn
+    assert insforge_client.get_persona("s1") is None
+    assert len(calls) == 1 and sleeps == []
+
 
-    monkeypatch.setattr(insforge_client.httpx, "post", fake_post)
+def test_plain_inserts_are_not_retried_on_server_errors(insforge_mocked, monkeypatch):
+    monkeypatch.setattr(insforge_client.time, "sleep", lambda seconds: None)
+    calls = []
+
+    def fake_post(url, headers, content, timeout):
+        calls.append(url)
+        return FakeResponse(503)
+
+    insforge_mocked.post = fake_post
+    # The insert may have landed before the 503, so a retry could duplicate rows
+    assert insforge_client.save_message("s1", "scammer", "hello") is False
+    assert len(calls) == 1
+
+
+def test_mark_callback_sent(insforge_mocked):
+    def fake_patch(url, headers, content, timeout):
+        return _OK_200
+
+    insforge_mocked.patch = fake_patch
+    assert insforge_client.mark_callback_sent("s1") is True
+
+
+def test_save_message_success(insforge_mocked):
+    def fake_post(url, headers, content, timeout):
+        return _OK_201
+
+    insforge_mocked.post = fake_post
     assert insforge_client.save_message("s1", "scammer", "hello") is True
+
+
+def test_queued_messages_flush_as_one_bulk_insert(insforge_mocked, monkeypatch):
+    # A placeholder flusher keeps the background thread out of the test; flush by hand
+    monkeypatch.setattr(insforge_client, "_flusher", object())
+    monkeypatch.setattr(insforge_client, "_message_buffer", [])
+    batches = []
+
+    def fake_post(url, headers, content, timeout):
+        batches.append([(row["sender"], row["message"]) for row in json.loads(content)])
+        return _OK_201
+
+    insforge_mocked.post = fake_post
+    insforge_client.queue_message("s1", "scammer", "pay now")
+    insforge_client.queue_message("s1", "agent", "kaun bol raha hai?", "stall")
+    assert insforge_client.flush_messages() is True
+    assert batches == [[("scammer", "pay now"), ("agent", "kaun bol raha hai?")]]
+    assert insforge_client.flush_messages() is True
+    assert len(batches) == 1
+
+
+def test_persona_cache_round_trips_independent_copies(monkeypatch):
+    monkeypatch.setattr(insforge_client, "_persona_cache", insforge_client.OrderedDict())
+    persona = {"name": "Kamla Devi", "age": 67, "family": {"son": "Raju"}}
+    insforge_client.cache_persona("p1", persona)
+    cached = insforge_client.get_cached_persona("p1")
+    assert cached == persona
+    cached["family"]["son"] = "changed"
+    assert insforge_client.get_cached_persona("p1") == persona
+    assert insforge_client.get_cached_persona("missing") is None
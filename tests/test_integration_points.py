@@ -47,6 +47,18 @@ def test_callback_payload_deduplicates_fields():
     assert intel["mentionedBanks"] == ["sbi"]
 
 
+def test_callback_payload_keeps_first_seen_order():
+    """Reality check: deduplication keeps the order intel was extracted in."""
+    payload = build_callback_payload(
+        session_id="order-1",
+        scam_detected=True,
+        total_messages=2,
+        intelligence={"upi_ids": ["b@ybl", "a@paytm", "b@ybl", "c@okaxis"]},
+        agent_notes="notes",
+    )
+    assert payload["extractedIntelligence"]["upiIds"] == ["b@ybl", "a@paytm", "c@okaxis"]
+
+
 def test_callback_payload_field_mapping():
     """Reality check: payload field names match GUVI expected schema."""
     payload = build_callback_payload(
@@ -72,6 +84,7 @@ def test_whatsapp_signature_verification(monkeypatch):
 
     assert wa_handler.verify_webhook_signature(payload, f"sha256={signature}") is True
     assert wa_handler.verify_webhook_signature(payload, "sha256=bad") is False
+    assert wa_handler.verify_webhook_signature(payload, f"sha256={'0' * 64}") is False
 
 
 def test_parse_webhook_message_text():
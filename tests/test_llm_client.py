@@ -36,7 +36,7 @@ def test_calculate_response_quality_scores_json_higher():
 def test_get_random_fallback_avoids_immediate_repeats():
     """Reality check: fallback selection avoids repeating already used replies."""
     session_id = "fallback-session"
-    llm_client._session_responses[session_id] = llm_client.GENERIC_FALLBACK_MESSAGES[:5]
+    llm_client._session_responses[session_id] = list(llm_client.GENERIC_FALLBACK_MESSAGES[:5])
     response = llm_client.get_random_fallback(session_id)
     assert response not in llm_client.GENERIC_FALLBACK_MESSAGES[:5]
 
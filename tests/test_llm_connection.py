@@ -1,12 +1,10 @@
 import os
-import sys
 from dotenv import load_dotenv
 
 # Load env vars
 load_dotenv()
 
-# Add project root to path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _path_setup  # noqa: F401  (puts the project root on sys.path)
 
 from core.llm_client import call_openrouter, OPENROUTER_MODEL
 
@@ -1,9 +1,7 @@
 """
 Test conversation memory and personalization
 """
-import sys
-import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import _path_setup  # noqa: F401  (puts the project root on sys.path)
 
 from core.conversation_analyzer import analyze_conversation, get_session_data, get_conversation_intel
 
@@ -51,7 +51,7 @@ def error_client(monkeypatch):
     monkeypatch.setattr(app_module, "get_cached_persona", lambda session_id: None)
     monkeypatch.setattr(app_module, "save_persona", lambda *args, **kwargs: None)
     monkeypatch.setattr(app_module, "cache_persona", lambda *args, **kwargs: None)
-    monkeypatch.setattr(app_module, "save_message", lambda *args, **kwargs: None)
+    monkeypatch.setattr(app_module, "queue_message", lambda *args, **kwargs: None)
     monkeypatch.setattr(app_module, "update_session_activity", lambda *args, **kwargs: None)
     monkeypatch.setattr(app_module, "save_intelligence", lambda *args, **kwargs: None)
     monkeypatch.setattr(app_module, "mark_callback_sent", lambda *args, **kwargs: None)
@@ -93,3 +93,27 @@ def test_whatsapp_parser_tolerates_empty_payloads(payload):
     from utils import whatsapp_handler as wa_handler
 
     assert wa_handler.parse_webhook_message(payload) is None
+
+
+def test_read_receipt_releases_slot_on_failure(monkeypatch):
+    """Reality check: a crashing or unschedulable read receipt never leaks its slot."""
+    slots = app_module.threading.BoundedSemaphore(1)
+    monkeypatch.setattr(app_module, "_READ_RECEIPT_SLOTS", slots)
+
+    def boom(message_id):
+        raise RuntimeError("graph down")
+
+    monkeypatch.setattr(app_module.wa_handler, "mark_message_read", boom)
+    assert slots.acquire(blocking=False)
+    with pytest.raises(RuntimeError):
+        app_module.send_read_receipt("msg-1")
+    assert slots.acquire(blocking=False)
+    slots.release()
+
+    def pool_closed(*args, **kwargs):
+        raise RuntimeError("cannot schedule new futures after shutdown")
+
+    monkeypatch.setattr(app_module, "run_async", pool_closed)
+    with pytest.raises(RuntimeError):
+        app_module.queue_read_receipt("msg-2")
+    assert slots.acquire(blocking=False)
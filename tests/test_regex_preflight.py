@@ -0,0 +1,57 @@
+"""
+GUVI Regex Pre-flight
+Each fakeData item from the GUVI scenarios must come out of its extractor.
+The same cases drive the pre-flight block of test_guvi_scenarios.py.
+
+Run standalone or spread across workers:
+    python tests/test_regex_preflight.py
+    pytest -n auto tests/test_regex_preflight.py
+"""
+
+import pytest
+
+import _path_setup  # noqa: F401  (script runs skip conftest.py)
+from models.intelligence import (
+    extract_upi_ids, extract_bank_accounts, extract_phone_numbers,
+    extract_urls, extract_emails, extract_keywords, extract_mentioned_banks
+)
+
+
+# (label, extractor, sample text, expected value) - phones use the +91-XXXXXXXXXX output format
+PREFLIGHT_CASES = [
+    ("bank_fraud: bank account", extract_bank_accounts,
+     "transfer from account 1234567890123456", "1234567890123456"),
+    ("bank_fraud: UPI ID", extract_upi_ids,
+     "send to scammer.fraud@fakebank", "scammer.fraud@fakebank"),
+    ("bank_fraud: phone", extract_phone_numbers,
+     "call me at +91-9876543210", "+91-9876543210"),
+    ("bank_fraud: mentioned bank", extract_mentioned_banks,
+     "Your SBI account has been compromised", "sbi"),
+    ("upi_fraud: UPI ID", extract_upi_ids,
+     "pay to cashback.scam@fakeupi", "cashback.scam@fakeupi"),
+    ("upi_fraud: phone", extract_phone_numbers,
+     "contact at +91-8765432109", "+91-8765432109"),
+    ("upi_fraud: mentioned bank", extract_mentioned_banks,
+     "cashback from Paytm", "paytm"),
+    ("phishing: URL", extract_urls,
+     "click http://amaz0n-deals.fake-site.com/claim?id=12345", "http://amaz0n-deals.fake-site.com/claim?id=12345"),
+    ("phishing: email", extract_emails,
+     "email us at offers@fake-amazon-deals.com", "offers@fake-amazon-deals.com"),
+    ("keywords: urgent", extract_keywords,
+     "URGENT: Your account has been compromised", "urgent"),
+    ("keywords: cashback", extract_keywords,
+     "You have won a cashback of Rs. 5000", "cashback"),
+]
+
+
+@pytest.mark.parametrize(
+    "label,func,text,expected", PREFLIGHT_CASES, ids=[c[0] for c in PREFLIGHT_CASES]
+)
+def test_preflight_extraction(label, func, text, expected):
+    """The fakeData item should be among the extractor's results (case-insensitive)."""
+    result = func(text)
+    assert expected.lower() in [r.lower() for r in result], f"{label}: expected {expected}, got {result}"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "--tb=short"])
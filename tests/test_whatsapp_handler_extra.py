@@ -49,6 +49,119 @@ def test_conversation_history_cache_roundtrip():
     assert history[-1]["text"] == "msg-24"
 
 
+def test_conversation_history_cache_evicts_least_recent(monkeypatch):
+    """Reality check: the history cache stays bounded and drops the idlest number first."""
+    monkeypatch.setattr(wa_handler, "_conversation_cache", wa_handler.OrderedDict())
+    monkeypatch.setattr(wa_handler, "_MAX_CACHED_CONVERSATIONS", 2)
+    wa_handler.add_to_conversation_history("911", "scammer", "a")
+    wa_handler.add_to_conversation_history("912", "scammer", "b")
+    wa_handler.get_conversation_history("911")  # 911 is now the most recent
+    wa_handler.add_to_conversation_history("913", "scammer", "c")
+    assert wa_handler.get_conversation_history("912") == []
+    assert [m["text"] for m in wa_handler.get_conversation_history("911")] == ["a"]
+
+
 def test_format_session_id():
     """Reality check: session id is normalized consistently."""
     assert wa_handler.format_session_id("919123456789") == "whatsapp_919123456789"
+
+
+def test_parse_webhook_body_and_interactive_reply():
+    """Reality check: raw webhook bytes decode and interactive replies yield their title."""
+    raw = (
+        b'{"entry":[{"changes":[{"value":{"messages":[{"from":"919876543210","id":"m1",'
+        b'"type":"interactive","interactive":{"type":"list_reply","list_reply":{"title":"Pay now"}}}]}}]}]}'
+    )
+    parsed = wa_handler.parse_webhook_message(wa_handler.parse_webhook_body(raw))
+    assert parsed["text"] == "Pay now"
+    assert parsed["sender_name"] == "Unknown"
+
+    with pytest.raises(ValueError):
+        wa_handler.parse_webhook_body(b"not json")
+
+
+def test_send_text_message_reuses_graph_endpoint(monkeypatch):
+    """Reality check: sends go through the shared session with cached URL and auth headers."""
+    calls = []
+
+    class FakeResponse:
+        status_code = 200
+        text = "ok"
+
+    def fake_post(url, headers, json, timeout):
+        calls.append((url, headers))
+        return FakeResponse()
+
+    monkeypatch.setattr(wa_handler, "WHATSAPP_PHONE_ID", "phone-1")
+    monkeypatch.setattr(wa_handler, "WHATSAPP_ACCESS_TOKEN", "token-1")
+    monkeypatch.setattr(wa_handler._SESSION, "post", fake_post)
+
+    assert wa_handler.send_text_message("919000000000", "hello") is True
+    assert wa_handler.mark_message_read("msg-1") is True
+    assert calls[0][0].endswith("/phone-1/messages")
+    assert calls[0][1]["Authorization"] == "Bearer token-1"
+    assert calls[0][1] is calls[1][1]
+
+
+def test_conversation_history_uses_redis_when_configured(monkeypatch):
+    """Reality check: with Redis configured, history is shared through a capped list."""
+    store = {}
+
+    class FakePipeline:
+        def __init__(self):
+            self.ops = []
+
+        def rpush(self, key, value):
+            self.ops.append(lambda: store.setdefault(key, []).append(value.encode()))
+
+        def ltrim(self, key, start, end):
+            self.ops.append(lambda: store.__setitem__(key, store[key][start:]))
+
+        def expire(self, key, seconds):
+            self.ops.append(lambda: None)
+
+        def execute(self):
+            for op in self.ops:
+                op()
+
+    class FakeRedis:
+        def pipeline(self, transaction=True):
+            return FakePipeline()
+
+        def lrange(self, key, start, end):
+            return list(store.get(key, []))
+
+        def delete(self, key):
+            store.pop(key, None)
+
+    monkeypatch.setattr(wa_handler, "_REDIS", FakeRedis())
+    phone = "919000000321"
+    for i in range(25):
+        wa_handler.add_to_conversation_history(phone, "scammer", f"msg-{i}")
+
+    history = wa_handler.get_conversation_history(phone)
+    assert len(history) == 20
+    assert history[-1]["text"] == "msg-24"
+    assert wa_handler.build_conversation_history_key(phone) not in wa_handler._conversation_cache
+
+    wa_handler.clear_conversation_history(phone)
+    assert wa_handler.get_conversation_history(phone) == []
+
+
+def test_conversation_history_falls_back_to_local_cache_when_redis_fails(monkeypatch):
+    """Reality check: an unreachable Redis degrades to the in-process history cache."""
+    class DownRedis:
+        def __getattr__(self, name):
+            def fail(*args, **kwargs):
+                raise ConnectionError("redis unreachable")
+            return fail
+
+    monkeypatch.setattr(wa_handler, "_REDIS", DownRedis())
+    phone = "919000000654"
+    wa_handler.add_to_conversation_history(phone, "scammer", "pay now")
+
+    assert wa_handler.build_conversation_history_key(phone) in wa_handler._conversation_cache
+    assert [m["text"] for m in wa_handler.get_conversation_history(phone)] == ["pay now"]
+
+    wa_handler.clear_conversation_history(phone)
+    assert wa_handler.build_conversation_history_key(phone) not in wa_handler._conversation_cache
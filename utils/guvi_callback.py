@@ -4,19 +4,39 @@ Sends intelligence reports to GUVI evaluation endpoint
 """
 
 import os
+import json
 import logging
-import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 
-from dotenv import load_dotenv
-
-load_dotenv()
+try:
+    import orjson  # Optional: faster payload serialization
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 GUVI_CALLBACK_URL = os.getenv("GUVI_CALLBACK_URL", "https://hackathon.guvi.in/api/updateHoneyPotFinalResult")
 
+# Keep-alive session so repeated callbacks reuse the TLS connection to GUVI
+_SESSION = requests.Session()
+_SESSION.headers.update({"Content-Type": "application/json"})
+_SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+# Reused workers for background callbacks; caps in-flight callbacks under bursts
+_CALLBACK_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="guvi-cb")
+
+
+def _encode(payload: Dict[str, Any]) -> bytes:
+    """Serialize a callback payload; falls back to json for anything orjson rejects."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(payload).encode()
+
 
 def send_callback(payload: Dict[str, Any]) -> bool:
     """
@@ -29,12 +49,8 @@ def send_callback(payload: Dict[str, Any]) -> bool:
         True if sent successfully
     """
     try:
-        response = requests.post(
-            GUVI_CALLBACK_URL,
-            json=payload,
-            headers={"Content-Type": "application/json"},
-            timeout=10
-        )
+        # Pre-encoded body; the session already sends Content-Type: application/json
+        response = _SESSION.post(GUVI_CALLBACK_URL, data=_encode(payload), timeout=10)
         
         if response.status_code == 200:
             logger.info(f"✅ GUVI callback sent successfully for session: {payload.get('sessionId')}")
@@ -53,15 +69,13 @@ def send_callback(payload: Dict[str, Any]) -> bool:
 
 def send_callback_async(payload: Dict[str, Any]) -> None:
     """
-    Send GUVI callback in background thread.
+    Send GUVI callback on the background worker pool.
     Ensures API response is not delayed by callback.
     
     Args:
         payload: Callback payload
     """
-    thread = threading.Thread(target=send_callback, args=(payload,))
-    thread.daemon = True
-    thread.start()
+    _CALLBACK_POOL.submit(send_callback, payload)
     logger.info(f"🚀 GUVI callback queued for session: {payload.get('sessionId')}")
 
 
@@ -85,6 +99,7 @@ def build_callback_payload(
     Returns:
         GUVI-formatted callback payload
     """
+    emails = list(dict.fromkeys(intelligence.get("emails", [])))
     return {
         "sessionId": session_id,
         "scamDetected": scam_detected,
@@ -93,21 +108,21 @@ def build_callback_payload(
         "totalMessagesExchanged": total_messages,
         "engagementDurationSeconds": total_messages * 45,
         "extractedIntelligence": {
-            "bankAccounts": list(set(intelligence.get("bank_accounts", []))),
-            "upiIds": list(set(intelligence.get("upi_ids", []))),
-            "emails": list(set(intelligence.get("emails", []))),
-            "emailAddresses": list(set(intelligence.get("emails", []))),
-            "phishingLinks": list(set(intelligence.get("phishing_links", []))),
-            "phoneNumbers": list(set(intelligence.get("phone_numbers", []))),
-            "ifscCodes": list(set(intelligence.get("ifsc_codes", []))),
-            "suspiciousKeywords": list(set(intelligence.get("suspicious_keywords", []))),
-            "fakeCredentials": list(set(intelligence.get("fake_credentials", []))),
-            "aadhaarNumbers": list(set(intelligence.get("aadhaar_numbers", []))),
-            "panNumbers": list(set(intelligence.get("pan_numbers", []))),
-            "mentionedBanks": list(set(intelligence.get("mentioned_banks", []))),
-            "caseIds": list(set(intelligence.get("case_ids", []))),
-            "policyNumbers": list(set(intelligence.get("policy_numbers", []))),
-            "orderNumbers": list(set(intelligence.get("order_numbers", [])))
+            "bankAccounts": list(dict.fromkeys(intelligence.get("bank_accounts", []))),
+            "upiIds": list(dict.fromkeys(intelligence.get("upi_ids", []))),
+            "emails": emails,
+            "emailAddresses": emails,
+            "phishingLinks": list(dict.fromkeys(intelligence.get("phishing_links", []))),
+            "phoneNumbers": list(dict.fromkeys(intelligence.get("phone_numbers", []))),
+            "ifscCodes": list(dict.fromkeys(intelligence.get("ifsc_codes", []))),
+            "suspiciousKeywords": list(dict.fromkeys(intelligence.get("suspicious_keywords", []))),
+            "fakeCredentials": list(dict.fromkeys(intelligence.get("fake_credentials", []))),
+            "aadhaarNumbers": list(dict.fromkeys(intelligence.get("aadhaar_numbers", []))),
+            "panNumbers": list(dict.fromkeys(intelligence.get("pan_numbers", []))),
+            "mentionedBanks": list(dict.fromkeys(intelligence.get("mentioned_banks", []))),
+            "caseIds": list(dict.fromkeys(intelligence.get("case_ids", []))),
+            "policyNumbers": list(dict.fromkeys(intelligence.get("policy_numbers", []))),
+            "orderNumbers": list(dict.fromkeys(intelligence.get("order_numbers", [])))
         },
         "agentNotes": agent_notes
     }
@@ -1,12 +1,22 @@
 import os
+import json
+import atexit
+import importlib.util
 import logging
-from typing import Dict, Any, Optional, List
-from datetime import datetime, UTC
+import random
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
+from urllib.parse import quote
 
 import httpx
-from dotenv import load_dotenv
 
-load_dotenv()
+try:
+    import orjson  # Optional: faster encoding of request bodies and the persona cache (_dumps/_loads)
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
@@ -15,28 +25,144 @@ INSFORGE_KEY = os.getenv("INSFORGE_ANON_KEY") or os.getenv("INSFORGE_API_KEY", "
 
 REST_URL = f"{INSFORGE_BASE_URL}/api/database/records" if INSFORGE_BASE_URL else ""
 
+# Pooled keep-alive client for every InsForge call; headers come from get_headers,
+# bodies are pre-encoded with _dumps. With the optional h2 package (httpx[http2])
+# concurrent writes multiplex over a few connections, so the pool can shrink.
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_LIMITS = (
+    httpx.Limits(max_connections=10, max_keepalive_connections=4)
+    if _HTTP2
+    else httpx.Limits(max_connections=20, max_keepalive_connections=20)
+)
+_CLIENT = httpx.Client(http2=_HTTP2, limits=_LIMITS)
+atexit.register(_CLIENT.close)
 
-def get_headers() -> Dict[str, str]:
+
+def get_headers(prefer: str = "return=minimal") -> Dict[str, str]:
+    # Shared across calls (httpx copies headers per request), so treat as read-only
+    return _headers_for(INSFORGE_KEY, prefer)
+
+
+@lru_cache(maxsize=8)
+def _headers_for(key: str, prefer: str) -> Dict[str, str]:
     return {
-        "Authorization": f"Bearer {INSFORGE_KEY}",
+        "Authorization": f"Bearer {key}",
         "Content-Type": "application/json",
-        "Prefer": "return=minimal"
+        "Prefer": prefer
     }
 
 
+@lru_cache(maxsize=4096)
+def _session_eq(session_id: str) -> str:
+    """PostgREST filter for one session, percent-encoded once per session id."""
+    return f"session_id=eq.{quote(session_id, safe='')}"
+
+
+def _iso_utc_now() -> str:
+    """Current UTC time as ISO-8601 with microseconds, e.g. 2026-01-31T12:00:00.123456+00:00.
+
+    Same shape as datetime.now(UTC).isoformat(), minus the datetime object per DB write.
+    """
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))}.{nanos // 1000:06d}+00:00"
+
+
+# Retry policy for InsForge calls: 429 and gateway errors are transient under load
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+_MAX_ATTEMPTS = 3
+_BACKOFF_BASE = 0.2
+_BACKOFF_MAX = 5.0
+# Total seconds _request may sleep between attempts. Background writes (run_async,
+# the message flusher) can afford to wait; reads and writes made while an API
+# request is in flight get a small budget so a struggling InsForge fails fast.
+_BACKGROUND_BACKOFF_BUDGET = 2 * _BACKOFF_MAX
+_REQUEST_PATH_BACKOFF_BUDGET = 0.5
+
+
+def _retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Seconds to wait before the next attempt: the server's Retry-After when it
+    gives one in seconds, otherwise exponential backoff with full jitter."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "").strip()
+        if retry_after.isdigit():
+            return min(float(retry_after), _BACKOFF_MAX)
+    return random.uniform(0, min(_BACKOFF_MAX, _BACKOFF_BASE * 2 ** attempt))
+
+
+def _request(
+    method: str,
+    url: str,
+    *,
+    idempotent: bool = True,
+    backoff_budget: float = _BACKGROUND_BACKOFF_BUDGET,
+    **kwargs,
+) -> httpx.Response:
+    """Send through the pooled client, retrying transient failures.
+
+    Non-idempotent calls (plain inserts) only retry when the request provably
+    never took effect: connection failures and 429 rejections. backoff_budget
+    caps the total time slept between attempts; when the next wait would exceed
+    it, the last response is returned (or the last error raised) as is.
+    """
+    send = getattr(_CLIENT, method)
+    for attempt in range(_MAX_ATTEMPTS - 1):
+        error = None
+        try:
+            response = send(url, **kwargs)
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            response, error = None, e
+        except httpx.TransportError as e:
+            if not idempotent:
+                raise
+            response, error = None, e
+        if response is not None:
+            status = response.status_code
+            if status != 429 and not (idempotent and status in _RETRY_STATUSES):
+                return response
+        delay = _retry_delay(attempt, response)
+        if delay > backoff_budget:
+            if error is not None:
+                raise error
+            return response
+        backoff_budget -= delay
+        time.sleep(delay)
+    return send(url, **kwargs)
+
+
+def _dumps(value: Any) -> bytes:
+    """Compact JSON bytes for request bodies and the persona cache (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def _loads(raw: bytes) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
 def get_persona(session_id: str) -> Optional[Dict[str, Any]]:
     if not REST_URL:
         logger.warning("InsForge not configured")
         return None
 
+    # A session's persona never changes once saved, so a recent copy skips the round trip
+    cached = _lru_get(_persona_cache, session_id)
+    if cached is not None and time.monotonic() - cached[0] < _PERSONA_TTL:
+        return _loads(cached[1])
+
     try:
-        url = f"{REST_URL}/personas?session_id=eq.{session_id}&select=persona_json&limit=1"
-        response = httpx.get(url, headers=get_headers(), timeout=10)
+        url = f"{REST_URL}/personas?{_session_eq(session_id)}&select=persona_json&limit=1"
+        response = _request(
+            "get", url, backoff_budget=_REQUEST_PATH_BACKOFF_BUDGET, headers=get_headers(), timeout=10
+        )
 
         if response.status_code == 200:
             data = response.json()
             if data:
-                return data[0].get("persona_json")
+                persona = data[0].get("persona_json")
+                if persona:
+                    cache_persona(session_id, persona)
+                return persona
 
         return None
     except Exception as e:
@@ -60,12 +186,16 @@ def save_persona(session_id: str, persona: Dict[str, Any]) -> bool:
             "ifsc": persona.get("bank", {}).get("ifsc"),
             "upi_id": persona.get("upi", {}).get("primary"),
             "phone": persona.get("phone"),
-            "persona_json": persona,
-            "created_at": datetime.now(UTC).isoformat()
+            "persona_json": persona
         }
 
-        url = f"{REST_URL}/personas"
-        response = httpx.post(url, headers=get_headers(), json=[data], timeout=10)
+        # Idempotent insert: a repeat save for the session keeps the existing row
+        url = f"{REST_URL}/personas?on_conflict=session_id"
+        headers = get_headers("return=minimal,resolution=ignore-duplicates")
+        response = _request(
+            "post", url, backoff_budget=_REQUEST_PATH_BACKOFF_BUDGET,
+            headers=headers, content=_dumps([data]), timeout=10,
+        )
 
         if response.status_code in [200, 201]:
             logger.info(f"Saved persona for session: {session_id}")
@@ -85,14 +215,11 @@ def update_session_activity(session_id: str, message_count: int) -> bool:
     try:
         data = {
             "message_count": message_count,
-            "last_activity": datetime.now(UTC).isoformat()
+            "last_activity": _iso_utc_now()
         }
 
-        url = f"{REST_URL}/personas?session_id=eq.{session_id}"
-        headers = get_headers()
-        headers["Prefer"] = "return=minimal"
-
-        response = httpx.patch(url, headers=headers, json=data, timeout=10)
+        url = f"{REST_URL}/personas?{_session_eq(session_id)}"
+        response = _request("patch", url, headers=get_headers(), content=_dumps(data), timeout=10)
         return response.status_code in [200, 204]
 
     except Exception as e:
@@ -112,27 +239,22 @@ def save_intelligence(
     try:
         data = {
             "session_id": session_id,
-            "scammer_upi": list(set(intelligence.get("upi_ids", []))),
-            "scammer_bank": list(set(intelligence.get("bank_accounts", []))),
-            "scammer_phone": list(set(intelligence.get("phone_numbers", []))),
-            "phishing_links": list(set(intelligence.get("phishing_links", []))),
-            "scam_keywords": list(set(intelligence.get("suspicious_keywords", []))),
+            "scammer_upi": list(dict.fromkeys(intelligence.get("upi_ids") or ())),
+            "scammer_bank": list(dict.fromkeys(intelligence.get("bank_accounts") or ())),
+            "scammer_phone": list(dict.fromkeys(intelligence.get("phone_numbers") or ())),
+            "phishing_links": list(dict.fromkeys(intelligence.get("phishing_links") or ())),
+            "scam_keywords": list(dict.fromkeys(intelligence.get("suspicious_keywords") or ())),
             "scam_detected": scam_detected,
             "agent_notes": agent_notes,
-            "callback_sent": False,
-            "created_at": datetime.now(UTC).isoformat()
+            "callback_sent": False
         }
 
-        check_url = f"{REST_URL}/intelligence?session_id=eq.{session_id}&select=id&limit=1"
-        check_resp = httpx.get(check_url, headers=get_headers(), timeout=5)
-
-        if check_resp.status_code == 200 and check_resp.json():
-            intel_id = check_resp.json()[0]["id"]
-            url = f"{REST_URL}/intelligence?id=eq.{intel_id}"
-            response = httpx.patch(url, headers=get_headers(), json=data, timeout=10)
-        else:
-            url = f"{REST_URL}/intelligence"
-            response = httpx.post(url, headers=get_headers(), json=[data], timeout=10)
+        # One upsert on the unique session_id instead of a lookup followed by PATCH/POST
+        url = f"{REST_URL}/intelligence?on_conflict=session_id"
+        headers = get_headers("return=minimal,resolution=merge-duplicates")
+        # The upsert writes callback_sent=False, so a cached True would be stale
+        _lru_pop(_callback_sent_cache, session_id)
+        response = _request("post", url, headers=headers, content=_dumps([data]), timeout=10)
 
         if response.status_code in [200, 201, 204]:
             logger.info(f"Saved intelligence for session: {session_id}")
@@ -148,14 +270,22 @@ def get_callback_sent(session_id: str) -> bool:
     if not REST_URL:
         return False
 
+    # Only True is cached: it is what mark_callback_sent wrote, and save_intelligence clears it
+    sent_until = _lru_get(_callback_sent_cache, session_id)
+    if sent_until is not None and time.monotonic() < sent_until:
+        return True
+
     try:
-        url = f"{REST_URL}/intelligence?session_id=eq.{session_id}&select=callback_sent&order=created_at.desc&limit=1"
-        response = httpx.get(url, headers=get_headers(), timeout=10)
+        url = f"{REST_URL}/intelligence?{_session_eq(session_id)}&select=callback_sent&order=created_at.desc&limit=1"
+        response = _request(
+            "get", url, backoff_budget=_REQUEST_PATH_BACKOFF_BUDGET, headers=get_headers(), timeout=10
+        )
 
         if response.status_code == 200:
             data = response.json()
-            if data:
-                return bool(data[0].get("callback_sent"))
+            if data and data[0].get("callback_sent"):
+                _remember_callback_sent(session_id)
+                return True
         return False
 
     except Exception as e:
@@ -169,18 +299,41 @@ def mark_callback_sent(session_id: str) -> bool:
 
     try:
         data = {"callback_sent": True}
-        url = f"{REST_URL}/intelligence?session_id=eq.{session_id}"
-        headers = get_headers()
-        headers["Prefer"] = "return=minimal"
-
-        response = httpx.patch(url, headers=headers, json=data, timeout=10)
-        return response.status_code in [200, 204]
+        url = f"{REST_URL}/intelligence?{_session_eq(session_id)}"
+        response = _request("patch", url, headers=get_headers(), content=_dumps(data), timeout=10)
+        if response.status_code in [200, 204]:
+            _remember_callback_sent(session_id)
+            return True
+        return False
 
     except Exception as e:
         logger.error(f"Error marking callback sent: {e}")
         return False
 
 
+def _message_row(session_id: str, sender: str, message: str, strategy_used: Optional[str]) -> Dict[str, Any]:
+    return {
+        "session_id": session_id,
+        "sender": sender,
+        "message": message,
+        "strategy_used": strategy_used,
+        # Client-side on purpose: buffered rows share one flush, and NOW() would tie them
+        "timestamp": _iso_utc_now()
+    }
+
+
+def _post_messages(rows: List[Dict[str, Any]]) -> bool:
+    """Insert conversation rows; PostgREST takes the whole list as one bulk insert."""
+    try:
+        url = f"{REST_URL}/conversations"
+        response = _request("post", url, idempotent=False, headers=get_headers(), content=_dumps(rows), timeout=10)
+        return response.status_code in [200, 201]
+
+    except Exception as e:
+        logger.error(f"Error saving message: {e}")
+        return False
+
+
 def save_message(
     session_id: str,
     sender: str,
@@ -190,30 +343,105 @@ def save_message(
     if not REST_URL:
         return False
 
-    try:
-        data = {
-            "session_id": session_id,
-            "sender": sender,
-            "message": message,
-            "strategy_used": strategy_used,
-            "timestamp": datetime.now(UTC).isoformat()
-        }
+    return _post_messages([_message_row(session_id, sender, message, strategy_used)])
 
-        url = f"{REST_URL}/conversations"
-        response = httpx.post(url, headers=get_headers(), json=[data], timeout=10)
-        return response.status_code in [200, 201]
 
-    except Exception as e:
-        logger.error(f"Error saving message: {e}")
-        return False
+# Write-behind buffer for conversation rows: queue_message returns at once and a
+# background flusher sends everything queued within _FLUSH_INTERVAL as one insert
+_FLUSH_INTERVAL = 0.1
+_FLUSH_MAX_ROWS = 50
+_message_buffer: List[Dict[str, Any]] = []
+_buffer_lock = threading.Lock()
+_flush_now = threading.Event()
+_flusher: Optional[threading.Thread] = None
+
+
+def queue_message(
+    session_id: str,
+    sender: str,
+    message: str,
+    strategy_used: Optional[str] = None
+) -> None:
+    global _flusher
+    if not REST_URL:
+        return
+
+    row = _message_row(session_id, sender, message, strategy_used)
+    with _buffer_lock:
+        _message_buffer.append(row)
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name="insforge-flush", daemon=True)
+            _flusher.start()
+        if len(_message_buffer) >= _FLUSH_MAX_ROWS:
+            _flush_now.set()
+
+
+def flush_messages() -> bool:
+    """Send every queued conversation row now; True when nothing was pending."""
+    with _buffer_lock:
+        rows = _message_buffer[:]
+        _message_buffer.clear()
+    if not rows:
+        return True
+    return _post_messages(rows)
 
 
-_persona_cache: Dict[str, Dict[str, Any]] = {}
+def _flush_loop() -> None:
+    while True:
+        _flush_now.wait(_FLUSH_INTERVAL)
+        _flush_now.clear()
+        flush_messages()
+
+
+atexit.register(flush_messages)
+
+
+# In-process persona cache, LRU-capped; evicted sessions are reloaded from InsForge.
+# Personas are kept JSON-encoded: bytes are far smaller than the nested dicts.
+# Entries younger than _PERSONA_TTL also answer get_persona without a round trip.
+_PERSONA_CACHE_MAX = 5_000
+_PERSONA_TTL = 60.0
+_persona_cache: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+# Sessions whose callback is known to be sent, with the monotonic time the entry expires
+_CALLBACK_SENT_CACHE_MAX = 10_000
+_CALLBACK_SENT_TTL = 300.0
+_callback_sent_cache: "OrderedDict[str, float]" = OrderedDict()
+
+
+# Guards the LRU bookkeeping of both caches against concurrent request threads
+_cache_lock = threading.Lock()
+
+
+def _lru_get(cache: OrderedDict, key: str):
+    with _cache_lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _lru_put(cache: OrderedDict, key: str, value, max_size: int) -> None:
+    with _cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > max_size:
+            cache.popitem(last=False)
+
+
+def _lru_pop(cache: OrderedDict, key: str) -> None:
+    with _cache_lock:
+        cache.pop(key, None)
 
 
 def get_cached_persona(session_id: str) -> Optional[Dict[str, Any]]:
-    return _persona_cache.get(session_id)
+    cached = _lru_get(_persona_cache, session_id)
+    return _loads(cached[1]) if cached is not None else None
 
 
 def cache_persona(session_id: str, persona: Dict[str, Any]) -> None:
-    _persona_cache[session_id] = persona
+    _lru_put(_persona_cache, session_id, (time.monotonic(), _dumps(persona)), _PERSONA_CACHE_MAX)
+
+
+def _remember_callback_sent(session_id: str) -> None:
+    _lru_put(_callback_sent_cache, session_id, time.monotonic() + _CALLBACK_SENT_TTL, _CALLBACK_SENT_CACHE_MAX)
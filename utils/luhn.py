@@ -2,6 +2,21 @@
 Luhn Algorithm Implementation for Valid Card Number Generation
 """
 
+# Luhn value of a doubled digit (2*d, minus 9 when that exceeds 9), indexed by d
+_DOUBLED_DIGIT = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+# Byte translation tables mapping ASCII '0'-'9' to their plain and doubled Luhn values
+_PLAIN = bytes(b - 48 if 48 <= b <= 57 else 0 for b in range(256))
+_DOUBLED = bytes(_DOUBLED_DIGIT[b - 48] if 48 <= b <= 57 else 0 for b in range(256))
+
+
+def _luhn_total(reversed_digits: str) -> int:
+    """Luhn sum of digits given right-to-left, doubling every second one (index 1, 3, ...)."""
+    if reversed_digits.isascii() and reversed_digits.isdigit():
+        raw = reversed_digits.encode()
+        return sum(raw[0::2].translate(_PLAIN)) + sum(raw[1::2].translate(_DOUBLED))
+    # Non-ASCII digits (or bad input) keep int()'s behaviour, including its ValueError
+    return sum(map(int, reversed_digits[0::2])) + sum(_DOUBLED_DIGIT[d] for d in map(int, reversed_digits[1::2]))
+
 
 def calculate_luhn_checksum(partial_number: str) -> int:
     """
@@ -13,15 +28,9 @@ def calculate_luhn_checksum(partial_number: str) -> int:
     Returns:
         The check digit (0-9) that makes the full number valid
     """
-    digits = [int(d) for d in partial_number]
-    
-    # Double every second digit from the right (which is every first from left for partial)
-    for i in range(len(digits) - 1, -1, -2):
-        digits[i] *= 2
-        if digits[i] > 9:
-            digits[i] -= 9
-    
-    total = sum(digits)
+    # The check digit will sit to the right, so the partial's rightmost digit is doubled:
+    # prepend a 0 placeholder for it and reuse the full-number sum
+    total = _luhn_total("0" + partial_number[::-1])
     check_digit = (10 - (total % 10)) % 10
     
     return check_digit
@@ -40,15 +49,8 @@ def is_valid_luhn(card_number: str) -> bool:
     if not card_number.isdigit():
         return False
     
-    digits = [int(d) for d in card_number]
-    
     # Double every second digit from the right
-    for i in range(len(digits) - 2, -1, -2):
-        digits[i] *= 2
-        if digits[i] > 9:
-            digits[i] -= 9
-    
-    return sum(digits) % 10 == 0
+    return _luhn_total(card_number[::-1]) % 10 == 0
 
 
 def generate_valid_card_number(prefix: str, total_length: int = 16) -> str:
@@ -64,9 +66,9 @@ def generate_valid_card_number(prefix: str, total_length: int = 16) -> str:
     """
     import random
     
-    # Generate random digits for the middle part
+    # Generate random digits for the middle part: one uniform draw, zero-padded
     remaining_length = total_length - len(prefix) - 1  # -1 for check digit
-    middle = ''.join([str(random.randint(0, 9)) for _ in range(remaining_length)])
+    middle = f"{random.randrange(10 ** remaining_length):0{remaining_length}d}" if remaining_length > 0 else ""
     
     # Combine prefix and middle
     partial = prefix + middle
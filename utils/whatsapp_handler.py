@@ -9,12 +9,24 @@ import logging
 import requests
 import hashlib
 import hmac
-from typing import Dict, Any, Optional, List
-from datetime import datetime, UTC
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Deque
 
-from dotenv import load_dotenv
+from urllib3.util.retry import Retry
 
-load_dotenv()
+try:
+    import orjson  # Optional: faster webhook body parsing
+except ImportError:
+    orjson = None
+
+try:
+    import redis  # Optional: history shared across gunicorn workers
+except ImportError:
+    redis = None
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +35,45 @@ WHATSAPP_PHONE_ID = os.getenv("WHATSAPP_PHONE_ID", "")
 WHATSAPP_ACCESS_TOKEN = os.getenv("WHATSAPP_ACCESS_TOKEN", "")
 WHATSAPP_VERIFY_TOKEN = os.getenv("WHATSAPP_VERIFY_TOKEN", "honeypot_verify_2026")
 WHATSAPP_APP_SECRET = os.getenv("WHATSAPP_APP_SECRET", "")
+REDIS_URL = os.getenv("REDIS_URL", "")
 
 # API Base URL
 WHATSAPP_API_URL = "https://graph.facebook.com/v21.0"
 
+# Keep-alive session so replies and read receipts reuse the TLS connection to Graph API.
+# Retries cover only failures where Meta never acted on the POST (connection errors,
+# 429 rate limits, honouring Retry-After), so a reply is never sent twice.
+_RETRY = Retry(
+    total=3,
+    connect=2,
+    read=0,
+    status=2,
+    status_forcelist=(429,),
+    allowed_methods=frozenset({"POST"}),
+    backoff_factor=0.5,
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+_SESSION = requests.Session()
+_SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=_RETRY))
+
+
+@lru_cache(maxsize=4)
+def _graph_messages_endpoint(phone_id: str, access_token: str):
+    """Messages URL and auth headers, built once per credential pair and shared read-only."""
+    url = f"{WHATSAPP_API_URL}/{phone_id}/messages"
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Content-Type": "application/json"
+    }
+    return url, headers
+
+
+@lru_cache(maxsize=4)
+def _keyed_hmac(secret: str):
+    """HMAC-SHA256 already keyed with the app secret; callers .copy() it per request."""
+    return hmac.new(secret.encode(), digestmod=hashlib.sha256)
+
 
 def verify_webhook_signature(payload: bytes, signature: str) -> bool:
     """
@@ -43,16 +90,20 @@ def verify_webhook_signature(payload: bytes, signature: str) -> bool:
         logger.warning("WHATSAPP_APP_SECRET not set, skipping signature verification")
         return True
     
-    if not signature or not signature.startswith("sha256="):
+    if not signature or signature[:7] != "sha256=":
+        return False
+    
+    # Compare raw digest bytes; malformed hex is simply a bad signature
+    try:
+        received = bytes.fromhex(signature[7:])
+    except ValueError:
         return False
     
-    expected_signature = hmac.new(
-        WHATSAPP_APP_SECRET.encode(),
-        payload,
-        hashlib.sha256
-    ).hexdigest()
+    # Keyed on the current secret, so a changed config never reuses a stale key
+    mac = _keyed_hmac(WHATSAPP_APP_SECRET).copy()
+    mac.update(payload)
     
-    return hmac.compare_digest(signature[7:], expected_signature)
+    return hmac.compare_digest(received, mac.digest())
 
 
 def verify_webhook_challenge(mode: str, token: str, challenge: str) -> tuple:
@@ -75,6 +126,24 @@ def verify_webhook_challenge(mode: str, token: str, challenge: str) -> tuple:
     return "Forbidden", 403
 
 
+def parse_webhook_body(raw: bytes) -> Dict[str, Any]:
+    """
+    Decode a raw webhook request body, with orjson when it is installed.
+    
+    Args:
+        raw: Raw request body (the same bytes the signature covers)
+    
+    Returns:
+        Decoded JSON payload
+
+    Raises:
+        ValueError: If the body is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 def parse_webhook_message(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Parse incoming WhatsApp webhook data to extract message info.
@@ -86,12 +155,11 @@ def parse_webhook_message(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         Parsed message dict or None if no message
     """
     try:
-        entry = data.get("entry", [{}])[0]
-        changes = entry.get("changes", [{}])[0]
-        value = changes.get("value", {})
-        
-        # Check for messages
-        messages = value.get("messages", [])
+        # Status updates (delivered/read) carry no messages: bail out before any other work
+        entry = (data.get("entry") or ({},))[0]
+        changes = (entry.get("changes") or ({},))[0]
+        value = changes.get("value") or {}
+        messages = value.get("messages")
         if not messages:
             return None
         
@@ -106,15 +174,17 @@ def parse_webhook_message(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         text = ""
         
         if msg_type == "text":
-            text = message.get("text", {}).get("body", "")
+            body = message.get("text")
+            text = body.get("body", "") if body else ""
         elif msg_type == "button":
-            text = message.get("button", {}).get("text", "")
+            button = message.get("button")
+            text = button.get("text", "") if button else ""
         elif msg_type == "interactive":
-            interactive = message.get("interactive", {})
-            if interactive.get("type") == "button_reply":
-                text = interactive.get("button_reply", {}).get("title", "")
-            elif interactive.get("type") == "list_reply":
-                text = interactive.get("list_reply", {}).get("title", "")
+            interactive = message.get("interactive") or {}
+            reply_type = interactive.get("type")
+            if reply_type in ("button_reply", "list_reply"):
+                reply = interactive.get(reply_type)
+                text = reply.get("title", "") if reply else ""
         
         return {
             "from": message.get("from"),  # Phone number
@@ -146,12 +216,7 @@ def send_text_message(to_number: str, message: str) -> bool:
         logger.error("WhatsApp credentials not configured")
         return False
     
-    url = f"{WHATSAPP_API_URL}/{WHATSAPP_PHONE_ID}/messages"
-    
-    headers = {
-        "Authorization": f"Bearer {WHATSAPP_ACCESS_TOKEN}",
-        "Content-Type": "application/json"
-    }
+    url, headers = _graph_messages_endpoint(WHATSAPP_PHONE_ID, WHATSAPP_ACCESS_TOKEN)
     
     payload = {
         "messaging_product": "whatsapp",
@@ -165,7 +230,7 @@ def send_text_message(to_number: str, message: str) -> bool:
     }
     
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
+        response = _SESSION.post(url, headers=headers, json=payload, timeout=10)
         
         if response.status_code == 200:
             logger.info(f"✅ WhatsApp message sent to {to_number[:6]}***")
@@ -192,12 +257,7 @@ def mark_message_read(message_id: str) -> bool:
     if not WHATSAPP_PHONE_ID or not WHATSAPP_ACCESS_TOKEN:
         return False
     
-    url = f"{WHATSAPP_API_URL}/{WHATSAPP_PHONE_ID}/messages"
-    
-    headers = {
-        "Authorization": f"Bearer {WHATSAPP_ACCESS_TOKEN}",
-        "Content-Type": "application/json"
-    }
+    url, headers = _graph_messages_endpoint(WHATSAPP_PHONE_ID, WHATSAPP_ACCESS_TOKEN)
     
     payload = {
         "messaging_product": "whatsapp",
@@ -206,10 +266,15 @@ def mark_message_read(message_id: str) -> bool:
     }
     
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=5)
-        return response.status_code == 200
-    except:
+        response = _SESSION.post(url, headers=headers, json=payload, timeout=5)
+    except Exception as e:
+        logger.warning(f"Read receipt failed for {message_id}: {e}")
+        return False
+    
+    if response.status_code != 200:
+        logger.warning(f"Read receipt rejected: {response.status_code} - {response.text}")
         return False
+    return True
 
 
 def format_session_id(phone_number: str) -> str:
@@ -238,39 +303,90 @@ def build_conversation_history_key(phone_number: str) -> str:
     return f"wa_history_{phone_number}"
 
 
-# In-memory conversation history cache (per phone number)
-_conversation_cache: Dict[str, List[Dict[str, str]]] = {}
+# In-memory conversation history cache (per phone number), LRU-capped so idle
+# numbers are dropped; the lock covers concurrent webhooks for the same number.
+# Each number keeps its last _MAX_HISTORY_MESSAGES messages.
+_MAX_CACHED_CONVERSATIONS = 10_000
+_MAX_HISTORY_MESSAGES = 20
+_conversation_cache: "OrderedDict[str, Deque[Dict[str, str]]]" = OrderedDict()
+_conversation_lock = threading.Lock()
+
+# With REDIS_URL set (and redis installed) history lives in a Redis list per number,
+# so every gunicorn worker sees the same conversation; the local cache is the fallback
+# when Redis is unset or unreachable. Idle numbers expire after a day. Short socket
+# timeouts keep an unreachable Redis from stalling the webhook before that fallback.
+_HISTORY_TTL_SECONDS = 24 * 60 * 60
+_REDIS_TIMEOUT_SECONDS = 0.5
+_REDIS = (
+    redis.Redis.from_url(
+        REDIS_URL,
+        socket_connect_timeout=_REDIS_TIMEOUT_SECONDS,
+        socket_timeout=_REDIS_TIMEOUT_SECONDS,
+    )
+    if redis is not None and REDIS_URL
+    else None
+)
 
 
 def get_conversation_history(phone_number: str) -> List[Dict[str, str]]:
     """Get cached conversation history for a phone number."""
     key = build_conversation_history_key(phone_number)
-    return _conversation_cache.get(key, [])
+    if _REDIS is not None:
+        try:
+            return [json.loads(item) for item in _REDIS.lrange(key, 0, -1)]
+        except Exception as e:
+            logger.warning(f"Redis history read failed, using local cache: {e}")
+    with _conversation_lock:
+        history = _conversation_cache.get(key)
+        if history is None:
+            return []
+        _conversation_cache.move_to_end(key)
+        return list(history)
 
 
 def add_to_conversation_history(phone_number: str, sender: str, text: str):
     """Add a message to conversation history cache."""
     key = build_conversation_history_key(phone_number)
-    
-    if key not in _conversation_cache:
-        _conversation_cache[key] = []
-    
-    _conversation_cache[key].append({
+    entry = {
         "sender": sender,
         "text": text,
-        "timestamp": int(datetime.now(UTC).timestamp() * 1000)
-    })
+        "timestamp": time.time_ns() // 1_000_000
+    }
     
-    # Keep only last 20 messages
-    if len(_conversation_cache[key]) > 20:
-        _conversation_cache[key] = _conversation_cache[key][-20:]
+    if _REDIS is not None:
+        try:
+            # One round trip: append, keep the newest messages, refresh the TTL
+            pipe = _REDIS.pipeline(transaction=False)
+            pipe.rpush(key, json.dumps(entry))
+            pipe.ltrim(key, -_MAX_HISTORY_MESSAGES, -1)
+            pipe.expire(key, _HISTORY_TTL_SECONDS)
+            pipe.execute()
+            return
+        except Exception as e:
+            logger.warning(f"Redis history write failed, using local cache: {e}")
+    
+    with _conversation_lock:
+        history = _conversation_cache.get(key)
+        if history is None:
+            # Bounded deque: appends past the cap drop the oldest message in O(1)
+            history = _conversation_cache[key] = deque(maxlen=_MAX_HISTORY_MESSAGES)
+            if len(_conversation_cache) > _MAX_CACHED_CONVERSATIONS:
+                _conversation_cache.popitem(last=False)
+        else:
+            _conversation_cache.move_to_end(key)
+        history.append(entry)
 
 
 def clear_conversation_history(phone_number: str):
     """Clear conversation history for a phone number."""
     key = build_conversation_history_key(phone_number)
-    if key in _conversation_cache:
-        del _conversation_cache[key]
+    if _REDIS is not None:
+        try:
+            _REDIS.delete(key)
+        except Exception as e:
+            logger.warning(f"Redis history clear failed: {e}")
+    with _conversation_lock:
+        _conversation_cache.pop(key, None)
 
 
 def is_whatsapp_configured() -> bool: